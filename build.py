@@ -3,71 +3,286 @@
 构建脚本 - 使用PyInstaller创建可执行文件
 """
 
+import argparse
+import hashlib
+import importlib.metadata
 import os
 import sys
 import subprocess
 import shutil
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from glob import glob
 from pathlib import Path
 
+APP_NAME = 'UIGF抽卡记录分离工具'
+DIST_DIR = Path('dist') / APP_NAME           # onedir 输出目录
+EXE_PATH = DIST_DIR / f'{APP_NAME}.exe'      # 可执行文件路径
+COPY_BUFFER_SIZE = 1024 * 1024               # 回退复制时使用的缓冲区大小 (1 MiB)
+BUILD_HASH_PATH = Path('dist') / '.build_hash'  # 上次成功构建时的输入哈希
+
+# 构建所需的程序文件
+REQUIRED_FILES = ['main.py', 'file_processor.py', 'game_config.py', 'utils.py']
+# 影响构建结果的全部输入文件，任一变化都需要重新构建
+BUILD_INPUTS = REQUIRED_FILES + [
+    'file_merger.py', 'file_repair.py', 'github_integration.py',
+    'build.py', 'README.md', 'requirements.txt', 'icon.ico',
+]
+# 影响构建结果的已安装包，版本变化或安装/卸载时需要重新构建
+BUILD_PACKAGES = ['pyinstaller', 'orjson']
+
+# 发布包中的使用说明，模块加载时即编码为UTF-8字节
+_USAGE_TEXT_BYTES = """UIGF/SRGF 抽卡记录分离工具 - 使用说明
+
+1. 打开 "UIGF抽卡记录分离工具" 文件夹，双击其中的 "UIGF抽卡记录分离工具.exe" 启动程序
+2. 选择游戏类型（原神或崩坏：星穹铁道）
+3. 选择输入的抽卡记录JSON文件
+4. 选择输出目录
+5. 点击"开始转换"按钮
+
+详细说明请参考 README.md 文件。
+
+如有问题，请查看 README.md 中的常见问题解答部分。
+""".encode('utf-8')
+
+# 程序未使用、但会被PyInstaller自动收集的模块，排除后可缩小打包体积
+EXCLUDED_MODULES = [
+    'tkinter.test', 'unittest', 'pydoc_data', 'test', 'xmlrpc',
+    'email.test', 'distutils', 'setuptools', 'pip',
+]
+
+def copy_file(src, dst):
+    """
+    复制文件及其元数据，优先使用系统提供的零拷贝接口
+    
+    Windows 下使用 CopyFile2，Linux 下使用 os.sendfile，
+    均不可用时回退到 1 MiB 缓冲区的 shutil.copyfileobj。
+    签名与 shutil.copy2 一致，可作为 shutil.copytree 的 copy_function。
+    """
+    src, dst = os.fspath(src), os.fspath(dst)
+    if os.path.isdir(dst):
+        dst = os.path.join(dst, os.path.basename(src))
+    
+    if sys.platform == 'win32':
+        try:
+            import ctypes
+            copy_file2 = ctypes.windll.kernel32.CopyFile2
+        except AttributeError:
+            # Windows 8 之前的系统没有 CopyFile2
+            copy_file2 = None
+        if copy_file2 is not None:
+            copy_file2.argtypes = [ctypes.c_wchar_p, ctypes.c_wchar_p, ctypes.c_void_p]
+            copy_file2.restype = ctypes.c_long
+            if copy_file2(src, dst, None) == 0:
+                shutil.copystat(src, dst)
+                return dst
+    
+    with open(src, 'rb') as fsrc, open(dst, 'wb') as fdst:
+        offset = 0
+        if hasattr(os, 'sendfile'):
+            size = os.fstat(fsrc.fileno()).st_size
+            try:
+                while offset < size:
+                    sent = os.sendfile(fdst.fileno(), fsrc.fileno(), offset, size - offset)
+                    if sent == 0:
+                        break
+                    offset += sent
+            except OSError:
+                # 部分平台（如macOS）只支持向socket发送，回退到普通复制
+                pass
+        fsrc.seek(offset)
+        fdst.seek(offset)
+        shutil.copyfileobj(fsrc, fdst, length=COPY_BUFFER_SIZE)
+    
+    shutil.copystat(src, dst)
+    return dst
+
+def copy_if_changed(src, dst):
+    """仅在目标文件缺失或已过期（大小不同或修改时间较旧）时调用 copy_file 复制"""
+    if os.path.isdir(dst):
+        dst = os.path.join(dst, os.path.basename(src))
+    
+    src_stat = os.stat(src)
+    dst_stat = stat_or_none(dst)
+    if (dst_stat is not None and dst_stat.st_size == src_stat.st_size
+            and dst_stat.st_mtime >= src_stat.st_mtime):
+        return dst
+    return copy_file(src, dst)
+
 def clean_build_dirs():
     """清理构建目录"""
     dirs_to_clean = ['build', 'dist', '__pycache__']
-    for dir_name in dirs_to_clean:
-        if os.path.exists(dir_name):
-            print(f"清理目录: {dir_name}")
-            shutil.rmtree(dir_name)
+    existing_dirs = [d for d in dirs_to_clean if os.path.isdir(d)]
+    
+    # 将各目录的一级子项拆分为独立任务，删除操作受系统调用延迟限制，可并行执行
+    targets = []
+    for dir_name in existing_dirs:
+        print(f"清理目录: {dir_name}")
+        with os.scandir(dir_name) as entries:
+            targets.extend(entries)
+    
+    def remove_entry(entry):
+        if entry.is_dir(follow_symlinks=False):
+            shutil.rmtree(entry.path)
+        else:
+            os.remove(entry.path)
+    
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        # list() 用于等待所有任务完成并抛出其中的异常
+        list(executor.map(remove_entry, targets))
+    
+    for dir_name in existing_dirs:
+        os.rmdir(dir_name)
     
     # 清理.spec文件
-    spec_files = [f for f in os.listdir('.') if f.endswith('.spec')]
+    spec_files = glob('*.spec')
     for spec_file in spec_files:
         print(f"删除文件: {spec_file}")
         os.remove(spec_file)
 
 def build_executable():
-    """构建可执行文件"""
+    """
+    构建可执行文件
+    
+    Returns:
+        os.stat_result: 生成的可执行文件的状态信息，构建失败时为None
+    """
     print("开始构建可执行文件...")
     
     # PyInstaller命令参数
     cmd = [
-        'pyinstaller',
-        '--onefile',           # 打包成单个文件
+        sys.executable, '-OO', '-m', 'PyInstaller',  # -OO 去除assert和文档字符串，缩小PYZ
+        '--onedir',            # 打包成目录，避免单文件模式每次启动时自解压
         '--windowed',          # Windows下隐藏控制台窗口
-        '--name=UIGF抽卡记录分离工具',  # 可执行文件名称
+        '--noupx',             # 不使用UPX压缩，缩短构建时间和启动时间
+        '--noconfirm',         # 覆盖已有输出目录时不再询问
+        f'--name={APP_NAME}',  # 可执行文件名称
         '--icon=icon.ico',     # 图标文件（如果存在）
         '--add-data=README.md;.',  # 包含README文件
-        'main.py'              # 主程序文件
     ]
+    for module in EXCLUDED_MODULES:
+        cmd.append(f'--exclude-module={module}')
+    cmd.append('main.py')      # 主程序文件
     
     # 如果没有图标文件，移除图标参数
     if not os.path.exists('icon.ico'):
         cmd.remove('--icon=icon.ico')
     
+    # 清理旧的未优化字节码，避免PyInstaller复用
+    if os.path.isdir('__pycache__'):
+        shutil.rmtree('__pycache__')
+    
+    # 使用持久化的缓存目录，使重新创建虚拟环境后的构建也能复用分析结果
+    env = os.environ.copy()
+    cache_root = Path.home() / '.cache'
+    env['PYINSTALLER_CONFIG_DIR'] = str(cache_root / 'pyinstaller-uigf')
+    env.setdefault('PIP_CACHE_DIR', str(cache_root / 'pip'))
+    env['PYTHONOPTIMIZE'] = '2'
+    
     try:
-        # 执行PyInstaller命令
-        result = subprocess.run(cmd, check=True, capture_output=True, text=True)
+        # 执行PyInstaller命令，实时输出日志，仅保留最后若干行用于错误提示
+        recent_lines = deque(maxlen=200)
+        with subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.STDOUT,
+                              text=True, bufsize=1, env=env) as process:
+            for line in process.stdout:
+                sys.stdout.write(line)
+                recent_lines.append(line)
+        
+        if process.returncode != 0:
+            raise subprocess.CalledProcessError(process.returncode, cmd,
+                                                output=''.join(recent_lines))
         print("构建成功！")
-        print(result.stdout)
         
         # 检查输出文件
-        exe_path = Path('dist/UIGF抽卡记录分离工具.exe')
-        if exe_path.exists():
-            file_size = exe_path.stat().st_size / (1024 * 1024)  # MB
-            print(f"可执行文件已生成: {exe_path}")
+        exe_stat = stat_or_none(EXE_PATH)
+        if exe_stat is not None:
+            file_size = exe_stat.st_size / (1024 * 1024)  # MB
+            print(f"可执行文件已生成: {EXE_PATH}")
             print(f"文件大小: {file_size:.2f} MB")
-            return True
         else:
             print("错误: 可执行文件未生成")
-            return False
+        return exe_stat
             
     except subprocess.CalledProcessError as e:
         print(f"构建失败: {e}")
-        print(f"错误输出: {e.stderr}")
-        return False
+        print(f"错误输出（最后{len(recent_lines)}行）:\n{e.output}")
+        return None
+
+def stat_or_none(path):
+    """获取文件状态，文件不存在时返回None"""
+    try:
+        return os.stat(path)
+    except FileNotFoundError:
+        return None
 
-def test_executable():
-    """测试可执行文件"""
-    exe_path = Path('dist/UIGF抽卡记录分离工具.exe')
-    if not exe_path.exists():
+def list_present_files(directory):
+    """一次目录枚举获取目录下所有文件名的集合"""
+    with os.scandir(directory) as entries:
+        return {entry.name for entry in entries if entry.is_file()}
+
+def package_version(name):
+    """获取已安装包的版本号，未安装时返回'missing'"""
+    try:
+        return importlib.metadata.version(name)
+    except importlib.metadata.PackageNotFoundError:
+        return 'missing'
+
+def compute_sources_hash():
+    """计算所有构建输入文件及构建环境的哈希值"""
+    hasher = hashlib.blake2b()
+    # 构建环境（Python、PyInstaller及可选的orjson版本）变化时同样需要重新构建
+    hasher.update(sys.version.encode('utf-8') + b'\0')
+    for package in BUILD_PACKAGES:
+        hasher.update(f'{package}={package_version(package)}'.encode('utf-8') + b'\0')
+    for name in BUILD_INPUTS:
+        hasher.update(name.encode('utf-8') + b'\0')
+        try:
+            with open(name, 'rb') as f:
+                hasher.update(f.read())
+        except FileNotFoundError:
+            # 可选文件（如icon.ico）缺失本身也是一种输入状态
+            hasher.update(b'<missing>')
+        hasher.update(b'\0')
+    return hasher.hexdigest()
+
+def read_build_hash():
+    """读取上次成功构建时记录的哈希值，不存在时返回None"""
+    try:
+        return BUILD_HASH_PATH.read_text(encoding='utf-8').strip()
+    except OSError:
+        return None
+
+def has_visible_window(pid):
+    """检查指定进程是否已创建可见的顶层窗口（仅Windows）"""
+    import ctypes
+    from ctypes import wintypes
+    
+    user32 = ctypes.windll.user32
+    found = []
+    
+    @ctypes.WINFUNCTYPE(wintypes.BOOL, wintypes.HWND, wintypes.LPARAM)
+    def enum_callback(hwnd, _lparam):
+        window_pid = wintypes.DWORD()
+        user32.GetWindowThreadProcessId(hwnd, ctypes.byref(window_pid))
+        if window_pid.value == pid and user32.IsWindowVisible(hwnd):
+            found.append(hwnd)
+            return False  # 找到后停止枚举
+        return True
+    
+    user32.EnumWindows(enum_callback, 0)
+    return bool(found)
+
+def test_executable(exe_stat):
+    """
+    测试可执行文件
+    
+    Args:
+        exe_stat (os.stat_result): build_executable() 返回的可执行文件状态，不存在时为None
+    """
+    exe_path = EXE_PATH
+    if exe_stat is None:
         print("错误: 可执行文件不存在")
         return False
     
@@ -75,16 +290,26 @@ def test_executable():
     try:
         # 启动程序并立即关闭（测试是否能正常启动）
         process = subprocess.Popen([str(exe_path)], 
-                                 stdout=subprocess.PIPE, 
-                                 stderr=subprocess.PIPE)
+                                 stdout=subprocess.DEVNULL, 
+                                 stderr=subprocess.DEVNULL)
         
-        # 等待一小段时间让程序启动
-        import time
-        time.sleep(2)
+        # 轮询等待程序启动：出现窗口或进程提前退出即结束等待，最多等待2秒
+        deadline = time.monotonic() + 2.0
+        while time.monotonic() < deadline:
+            if process.poll() is not None:
+                break
+            if sys.platform == 'win32' and has_visible_window(process.pid):
+                break
+            time.sleep(0.05)
         
-        # 终止进程
-        process.terminate()
-        process.wait(timeout=5)
+        if process.poll() is not None:
+            if process.returncode != 0:
+                print(f"可执行文件测试失败: 程序异常退出，返回码 {process.returncode}")
+                return False
+        else:
+            # 终止进程
+            process.terminate()
+            process.wait(timeout=5)
         
         print("可执行文件测试通过")
         return True
@@ -93,94 +318,116 @@ def test_executable():
         print(f"可执行文件测试失败: {e}")
         return False
 
-def create_release_package():
-    """创建发布包"""
+def create_release_package(exe_stat):
+    """
+    创建发布包
+    
+    Args:
+        exe_stat (os.stat_result): build_executable() 返回的可执行文件状态，不存在时为None
+    """
     print("创建发布包...")
     
+    # 保留已有的发布目录，只复制有变化的文件，避免每次重写体积较大的程序文件
     release_dir = Path('release')
-    if release_dir.exists():
-        shutil.rmtree(release_dir)
+    release_dir.mkdir(parents=True, exist_ok=True)
     
-    release_dir.mkdir()
+    # 收集复制任务：程序目录（onedir 模式下可执行文件依赖同目录下的运行库）和文档文件
+    copy_tasks = []
+    if exe_stat is not None:
+        copy_tasks.append(partial(shutil.copytree, DIST_DIR, release_dir / APP_NAME,
+                                  copy_function=copy_if_changed, dirs_exist_ok=True))
     
-    # 复制可执行文件
-    exe_path = Path('dist/UIGF抽卡记录分离工具.exe')
-    if exe_path.exists():
-        shutil.copy2(exe_path, release_dir)
-    
-    # 复制文档文件
     docs_to_copy = ['README.md', 'requirements.txt']
+    present_files = list_present_files('.')
     for doc in docs_to_copy:
-        if os.path.exists(doc):
-            shutil.copy2(doc, release_dir)
+        if doc in present_files:
+            copy_tasks.append(partial(copy_if_changed, doc, release_dir))
     
-    # 创建使用说明
-    usage_text = """UIGF/SRGF 抽卡记录分离工具 - 使用说明
-
-1. 双击 "UIGF抽卡记录分离工具.exe" 启动程序
-2. 选择游戏类型（原神或崩坏：星穹铁道）
-3. 选择输入的抽卡记录JSON文件
-4. 选择输出目录
-5. 点击"开始转换"按钮
-
-详细说明请参考 README.md 文件。
-
-如有问题，请查看 README.md 中的常见问题解答部分。
-"""
+    # 小文件复制受系统调用延迟限制，并行执行以重叠等待时间
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        futures = [executor.submit(task) for task in copy_tasks]
+        for future in futures:
+            future.result()
     
-    with open(release_dir / '使用说明.txt', 'w', encoding='utf-8') as f:
-        f.write(usage_text)
+    # 创建使用说明
+    with open(release_dir / '使用说明.txt', 'wb') as f:
+        f.write(_USAGE_TEXT_BYTES)
     
     print(f"发布包已创建: {release_dir}")
     
     # 显示发布包内容
     print("发布包内容:")
-    for item in release_dir.iterdir():
-        if item.is_file():
-            size = item.stat().st_size
-            if size > 1024 * 1024:
-                size_str = f"{size / (1024 * 1024):.2f} MB"
-            elif size > 1024:
-                size_str = f"{size / 1024:.2f} KB"
-            else:
-                size_str = f"{size} bytes"
-            print(f"  {item.name} ({size_str})")
-
-def main():
+    with os.scandir(release_dir) as entries:
+        for item in entries:
+            if item.is_file():
+                size = item.stat(follow_symlinks=False).st_size
+                if size > 1024 * 1024:
+                    size_str = f"{size / (1024 * 1024):.2f} MB"
+                elif size > 1024:
+                    size_str = f"{size / 1024:.2f} KB"
+                else:
+                    size_str = f"{size} bytes"
+                print(f"  {item.name} ({size_str})")
+
+def parse_args(argv=None):
+    """解析命令行参数"""
+    parser = argparse.ArgumentParser(description="UIGF/SRGF 抽卡记录分离工具 - 构建脚本")
+    parser.add_argument('--clean', action='store_true',
+                        help="构建前清理 build/、dist/ 等目录（默认保留以便增量构建）")
+    parser.add_argument('--skip-test', action='store_true',
+                        help="跳过可执行文件启动测试（设置了CI环境变量时自动跳过）")
+    args = parser.parse_args(argv)
+    # CI=false、CI=0 等显式关闭的取值不跳过测试
+    if os.environ.get('CI', '').lower() not in ('', '0', 'false'):
+        args.skip_test = True
+    return args
+
+def main(argv=None):
     """主函数"""
+    args = parse_args(argv)
     print("UIGF/SRGF 抽卡记录分离工具 - 构建脚本")
     print("=" * 50)
     
     # 检查Python版本
-    if sys.version_info < (3, 7):
-        print("错误: 需要Python 3.7或更高版本")
+    if sys.version_info < (3, 8):
+        print("错误: 需要Python 3.8或更高版本")
         return False
     
     # 检查必需文件
-    required_files = ['main.py', 'file_processor.py', 'game_config.py', 'utils.py']
-    for file in required_files:
-        if not os.path.exists(file):
-            print(f"错误: 缺少必需文件 {file}")
-            return False
+    present_files = list_present_files('.')
+    missing = [f for f in REQUIRED_FILES if f not in present_files]
+    if missing:
+        print(f"错误: 缺少必需文件 {', '.join(missing)}")
+        return False
     
     try:
-        # 1. 清理构建目录
-        clean_build_dirs()
+        # 1. 清理构建目录（仅在指定 --clean 时执行，保留PyInstaller分析缓存）
+        if args.clean:
+            clean_build_dirs()
         
-        # 2. 构建可执行文件
-        if not build_executable():
-            return False
+        # 2. 构建可执行文件（输入文件未变化时跳过）
+        sources_hash = compute_sources_hash()
+        exe_stat = stat_or_none(EXE_PATH)
+        if exe_stat is not None and read_build_hash() == sources_hash:
+            print("源文件未变化，跳过构建，使用已有的 dist/")
+        else:
+            exe_stat = build_executable()
+            if exe_stat is None:
+                return False
+            BUILD_HASH_PATH.write_text(sources_hash, encoding='utf-8')
         
         # 3. 测试可执行文件
-        if not test_executable():
+        if args.skip_test:
+            print("已跳过可执行文件测试")
+        elif not test_executable(exe_stat):
             print("警告: 可执行文件测试失败，但构建已完成")
         
         # 4. 创建发布包
-        create_release_package()
+        create_release_package(exe_stat)
         
         print("\n" + "=" * 50)
         print("构建完成！")
-        print("可执行文件位置: dist/UIGF抽卡记录分离工具.exe")
+        print(f"可执行文件位置: {EXE_PATH.as_posix()}")
         print("发布包位置: release/")
         
         return True
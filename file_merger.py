@@ -10,8 +10,38 @@ GitHub: https://github.com/maqibg/yunzai-uigf-splitte
 
 import json
 import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from itertools import chain
+from operator import methodcaller
 from game_config import GameConfig
-from utils import validate_json_structure, create_output_directory, extract_uid_from_data, compare_records_by_id, sanitize_filename, format_progress_message
+from utils import validate_json_structure, create_output_directory, extract_uid_from_data, compare_records_by_id, sanitize_filename, format_progress_message, load_json_file, write_json_document, JSON_WRITE_BUFFER_SIZE
+
+# 合并后记录数量的合理上限
+MAX_MERGE_RECORDS = 100000
+
+# 记录时间格式 "YYYY-MM-DD HH:MM:SS"（与 strptime 的 "%Y-%m-%d %H:%M:%S" 一样允许一位数的月日时分秒，日期和时间之间允许任意空白）
+_RECORD_TIME_RE = re.compile(r'(\d{4})-(\d{1,2})-(\d{1,2})\s+(\d{1,2}):(\d{1,2}):(\d{1,2})')
+
+
+def _parse_record_time(time_value):
+    """
+    解析记录中的时间字符串
+    
+    Args:
+        time_value: 记录中的time字段值
+        
+    Returns:
+        datetime: 解析后的时间，格式不正确或日期无效时返回None
+    """
+    match = _RECORD_TIME_RE.fullmatch(str(time_value))
+    if match is None:
+        return None
+    try:
+        return datetime(*map(int, match.groups()))
+    except ValueError:
+        return None
 
 
 class FileMerger:
@@ -30,6 +60,44 @@ class FileMerger:
         
         if not self.gacha_types:
             raise ValueError(f"不支持的游戏类型: {game_type}")
+        
+        # 用于逐条记录判断gacha_type是否有效的集合
+        self.gacha_type_set = frozenset(map(str, self.gacha_types))
+    
+    def _load_merge_file(self, file_path, file_label):
+        """
+        加载单个待合并文件并提取UID
+        
+        Args:
+            file_path (str): 文件路径
+            file_label (str): 文件在错误信息中的称呼，如"第一个文件"
+            
+        Returns:
+            tuple: (data, uid, error)
+                   uid (str): 提取到的UID，提取失败则为None
+                   error (tuple): 读取失败时为(error_type, issue, error_message)，否则为None
+        """
+        try:
+            data = load_json_file(file_path)
+        except PermissionError:
+            # 不预先检查可读性，由打开文件时的异常判断
+            return None, None, ("permission_error", "文件不可读，权限不足",
+                                f"{file_label}不可读，请检查文件权限: {file_path}")
+        except json.JSONDecodeError as e:
+            line_info = ""
+            if hasattr(e, 'lineno') and hasattr(e, 'colno'):
+                line_info = f" (第{e.lineno}行，第{e.colno}列)"
+            error_msg = f"JSON格式错误{line_info}: {e.msg}"
+            return None, None, ("json_format_error", error_msg, f"{file_label}{error_msg}")
+        except UnicodeDecodeError as e:
+            return None, None, ("encoding_error", "文件编码错误，不是UTF-8格式",
+                                f"{file_label}编码错误，请确保文件使用UTF-8编码: {str(e)}")
+        except Exception as e:
+            return None, None, ("file_read_error", f"读取失败: {str(e)}",
+                                f"读取{file_label}时发生错误: {str(e)}")
+        
+        # 提取UID（提取失败时为None，由调用方在结构验证之后报告）
+        return data, extract_uid_from_data(data), None
     
     def validate_merge_files(self, file1_path, file2_path):
         """
@@ -46,6 +114,22 @@ class FileMerger:
                    uid (str): 共同的UID，如果验证失败则为None
                    error_details (dict): 详细错误信息
         """
+        return self._validate_and_load_merge_files(file1_path, file2_path)[:4]
+    
+    def _validate_and_load_merge_files(self, file1_path, file2_path):
+        """
+        验证两个文件是否可以合并，并返回验证时解析的数据，避免合并时重复解析
+        
+        Args:
+            file1_path (str): 第一个文件路径
+            file2_path (str): 第二个文件路径
+            
+        Returns:
+            tuple: (is_valid, error_message, uid, error_details, data1, data2)
+                   前四项与 validate_merge_files 相同
+                   data1 (dict): 第一个文件的数据，如果验证失败则为None
+                   data2 (dict): 第二个文件的数据，如果验证失败则为None
+        """
         error_details = {
             "error_type": None,
             "file1_issues": [],
@@ -54,175 +138,131 @@ class FileMerger:
         }
         
         try:
-            # 检查文件是否存在
-            if not os.path.exists(file1_path):
+            # 每个文件只获取一次状态信息，同时用于存在性、同一文件和大小检查
+            try:
+                stat1 = os.stat(file1_path)
+            except FileNotFoundError:
                 error_details["error_type"] = "file_not_found"
                 error_details["file1_issues"].append("文件不存在")
-                return False, f"第一个文件不存在: {file1_path}", None, error_details
+                return False, f"第一个文件不存在: {file1_path}", None, error_details, None, None
+            except OSError as e:
+                error_details["error_type"] = "file_access_error"
+                return False, f"无法访问文件信息: {str(e)}", None, error_details, None, None
             
-            if not os.path.exists(file2_path):
+            try:
+                stat2 = os.stat(file2_path)
+            except FileNotFoundError:
                 error_details["error_type"] = "file_not_found"
                 error_details["file2_issues"].append("文件不存在")
-                return False, f"第二个文件不存在: {file2_path}", None, error_details
+                return False, f"第二个文件不存在: {file2_path}", None, error_details, None, None
+            except OSError as e:
+                error_details["error_type"] = "file_access_error"
+                return False, f"无法访问文件信息: {str(e)}", None, error_details, None, None
             
-            # 检查是否为同一个文件
-            if os.path.abspath(file1_path) == os.path.abspath(file2_path):
+            # 检查是否为同一个文件（比较设备号和inode，同时识别链接到同一文件的不同路径）
+            if os.path.samestat(stat1, stat2):
                 error_details["error_type"] = "same_file"
                 error_details["compatibility_issues"].append("选择了同一个文件")
-                return False, "不能选择同一个文件进行合并", None, error_details
-            
-            # 检查文件是否可读
-            if not os.access(file1_path, os.R_OK):
-                error_details["error_type"] = "permission_error"
-                error_details["file1_issues"].append("文件不可读，权限不足")
-                return False, f"第一个文件不可读，请检查文件权限: {file1_path}", None, error_details
-            
-            if not os.access(file2_path, os.R_OK):
-                error_details["error_type"] = "permission_error"
-                error_details["file2_issues"].append("文件不可读，权限不足")
-                return False, f"第二个文件不可读，请检查文件权限: {file2_path}", None, error_details
+                return False, "不能选择同一个文件进行合并", None, error_details, None, None
             
             # 检查文件大小是否合理
-            try:
-                file1_size = os.path.getsize(file1_path)
-                file2_size = os.path.getsize(file2_path)
-                
-                if file1_size == 0:
-                    error_details["error_type"] = "empty_file"
-                    error_details["file1_issues"].append("文件为空")
-                    return False, "第一个文件为空", None, error_details
-                
-                if file2_size == 0:
-                    error_details["error_type"] = "empty_file"
-                    error_details["file2_issues"].append("文件为空")
-                    return False, "第二个文件为空", None, error_details
-                
-                # 检查文件大小是否过大（超过100MB）
-                max_size = 100 * 1024 * 1024  # 100MB
-                if file1_size > max_size:
-                    error_details["error_type"] = "file_too_large"
-                    error_details["file1_issues"].append(f"文件过大 ({file1_size // (1024*1024)}MB)")
-                    return False, f"第一个文件过大 ({file1_size // (1024*1024)}MB)，可能不是有效的抽卡记录文件", None, error_details
-                
-                if file2_size > max_size:
-                    error_details["error_type"] = "file_too_large"
-                    error_details["file2_issues"].append(f"文件过大 ({file2_size // (1024*1024)}MB)")
-                    return False, f"第二个文件过大 ({file2_size // (1024*1024)}MB)，可能不是有效的抽卡记录文件", None, error_details
-                    
-            except OSError as e:
-                error_details["error_type"] = "file_access_error"
-                return False, f"无法访问文件信息: {str(e)}", None, error_details
-            
-            # 加载第一个文件
-            data1 = None
-            try:
-                with open(file1_path, 'r', encoding='utf-8') as f:
-                    data1 = json.load(f)
-            except json.JSONDecodeError as e:
-                error_details["error_type"] = "json_format_error"
-                line_info = ""
-                if hasattr(e, 'lineno') and hasattr(e, 'colno'):
-                    line_info = f" (第{e.lineno}行，第{e.colno}列)"
-                error_msg = f"JSON格式错误{line_info}: {e.msg}"
-                error_details["file1_issues"].append(error_msg)
-                return False, f"第一个文件{error_msg}", None, error_details
-            except UnicodeDecodeError as e:
-                error_details["error_type"] = "encoding_error"
-                error_details["file1_issues"].append("文件编码错误，不是UTF-8格式")
-                return False, f"第一个文件编码错误，请确保文件使用UTF-8编码: {str(e)}", None, error_details
-            except Exception as e:
-                error_details["error_type"] = "file_read_error"
-                error_details["file1_issues"].append(f"读取失败: {str(e)}")
-                return False, f"读取第一个文件时发生错误: {str(e)}", None, error_details
+            file1_size = stat1.st_size
+            file2_size = stat2.st_size
+            
+            if file1_size == 0:
+                error_details["error_type"] = "empty_file"
+                error_details["file1_issues"].append("文件为空")
+                return False, "第一个文件为空", None, error_details, None, None
+            
+            if file2_size == 0:
+                error_details["error_type"] = "empty_file"
+                error_details["file2_issues"].append("文件为空")
+                return False, "第二个文件为空", None, error_details, None, None
+            
+            # 检查文件大小是否过大（超过100MB）
+            max_size = 100 * 1024 * 1024  # 100MB
+            if file1_size > max_size:
+                error_details["error_type"] = "file_too_large"
+                error_details["file1_issues"].append(f"文件过大 ({file1_size // (1024*1024)}MB)")
+                return False, f"第一个文件过大 ({file1_size // (1024*1024)}MB)，可能不是有效的抽卡记录文件", None, error_details, None, None
+            
+            if file2_size > max_size:
+                error_details["error_type"] = "file_too_large"
+                error_details["file2_issues"].append(f"文件过大 ({file2_size // (1024*1024)}MB)")
+                return False, f"第二个文件过大 ({file2_size // (1024*1024)}MB)，可能不是有效的抽卡记录文件", None, error_details, None, None
+            
+            # 两个文件的读取和UID提取互不依赖，并行执行以重叠磁盘I/O与JSON解析
+            with ThreadPoolExecutor(max_workers=2) as executor:
+                future1 = executor.submit(self._load_merge_file, file1_path, "第一个文件")
+                future2 = executor.submit(self._load_merge_file, file2_path, "第二个文件")
+                data1, uid1, error1 = future1.result()
+                data2, uid2, error2 = future2.result()
+            
+            # 按文件顺序报告错误
+            for error, issues_key in ((error1, "file1_issues"), (error2, "file2_issues")):
+                if error:
+                    error_type, issue, error_msg = error
+                    error_details["error_type"] = error_type
+                    error_details[issues_key].append(issue)
+                    return False, error_msg, None, error_details, None, None
+            
+            # 先检查UID是否相同：只需常数次查找，UID不同（最常见的失败情况）时无需再验证结构
+            if uid1 and uid2 and uid1 != uid2:
+                error_details["error_type"] = "uid_mismatch"
+                error_details["compatibility_issues"].append(f"UID不匹配: 文件1({uid1}) vs 文件2({uid2})")
+                detailed_error = self._format_uid_mismatch_error(uid1, uid2, file1_path, file2_path)
+                return False, detailed_error, None, error_details, None, None
             
-            # 加载第二个文件
-            data2 = None
-            try:
-                with open(file2_path, 'r', encoding='utf-8') as f:
-                    data2 = json.load(f)
-            except json.JSONDecodeError as e:
-                error_details["error_type"] = "json_format_error"
-                line_info = ""
-                if hasattr(e, 'lineno') and hasattr(e, 'colno'):
-                    line_info = f" (第{e.lineno}行，第{e.colno}列)"
-                error_msg = f"JSON格式错误{line_info}: {e.msg}"
-                error_details["file2_issues"].append(error_msg)
-                return False, f"第二个文件{error_msg}", None, error_details
-            except UnicodeDecodeError as e:
-                error_details["error_type"] = "encoding_error"
-                error_details["file2_issues"].append("文件编码错误，不是UTF-8格式")
-                return False, f"第二个文件编码错误，请确保文件使用UTF-8编码: {str(e)}", None, error_details
-            except Exception as e:
-                error_details["error_type"] = "file_read_error"
-                error_details["file2_issues"].append(f"读取失败: {str(e)}")
-                return False, f"读取第二个文件时发生错误: {str(e)}", None, error_details
-            
-            # 验证第一个文件的JSON结构
-            is_valid1, error_msg1 = validate_json_structure(data1, self.game_type)
-            if not is_valid1:
-                error_details["error_type"] = "format_incompatible"
-                error_details["file1_issues"].append(f"格式不符合{self.format_info['format_name']}标准: {error_msg1}")
-                return False, f"第一个文件格式错误: {error_msg1}", None, error_details
-            
-            # 验证第二个文件的JSON结构
-            is_valid2, error_msg2 = validate_json_structure(data2, self.game_type)
-            if not is_valid2:
-                error_details["error_type"] = "format_incompatible"
-                error_details["file2_issues"].append(f"格式不符合{self.format_info['format_name']}标准: {error_msg2}")
-                return False, f"第二个文件格式错误: {error_msg2}", None, error_details
-            
-            # 提取两个文件的UID
-            uid1 = extract_uid_from_data(data1)
-            uid2 = extract_uid_from_data(data2)
+            # 验证两个文件的JSON结构
+            for data, file_label, issues_key in ((data1, "第一个文件", "file1_issues"),
+                                                 (data2, "第二个文件", "file2_issues")):
+                is_valid, error_msg = validate_json_structure(data, self.game_type)
+                if not is_valid:
+                    error_details["error_type"] = "format_incompatible"
+                    error_details[issues_key].append(f"格式不符合{self.format_info['format_name']}标准: {error_msg}")
+                    return False, f"{file_label}格式错误: {error_msg}", None, error_details, None, None
             
             if not uid1:
                 error_details["error_type"] = "uid_extraction_failed"
                 error_details["file1_issues"].append("无法提取有效的UID")
-                return False, "第一个文件中无法提取有效的UID", None, error_details
+                return False, "第一个文件中无法提取有效的UID", None, error_details, None, None
             
             if not uid2:
                 error_details["error_type"] = "uid_extraction_failed"
                 error_details["file2_issues"].append("无法提取有效的UID")
-                return False, "第二个文件中无法提取有效的UID", None, error_details
-            
-            # 检查UID是否相同
-            if uid1 != uid2:
-                error_details["error_type"] = "uid_mismatch"
-                error_details["compatibility_issues"].append(f"UID不匹配: 文件1({uid1}) vs 文件2({uid2})")
-                detailed_error = self._format_uid_mismatch_error(uid1, uid2, file1_path, file2_path)
-                return False, detailed_error, None, error_details
-            
-            # 检查游戏类型兼容性
-            game_type_compatible, game_error = self._check_game_type_compatibility(data1, data2)
-            if not game_type_compatible:
-                error_details["error_type"] = "game_type_incompatible"
-                error_details["compatibility_issues"].append(game_error)
-                return False, f"游戏类型不兼容: {game_error}", None, error_details
+                return False, "第二个文件中无法提取有效的UID", None, error_details, None, None
             
-            # 检查记录数量是否合理
+            # 检查记录数量是否合理（只需len()，在逐条扫描记录之前进行，超限文件尽早失败）
             records1 = data1.get("list", [])
             records2 = data2.get("list", [])
             
             if not isinstance(records1, list):
                 error_details["error_type"] = "invalid_record_format"
                 error_details["file1_issues"].append("记录列表格式错误，应为数组")
-                return False, "第一个文件中的记录列表格式错误", None, error_details
+                return False, "第一个文件中的记录列表格式错误", None, error_details, None, None
             
             if not isinstance(records2, list):
                 error_details["error_type"] = "invalid_record_format"
                 error_details["file2_issues"].append("记录列表格式错误，应为数组")
-                return False, "第二个文件中的记录列表格式错误", None, error_details
+                return False, "第二个文件中的记录列表格式错误", None, error_details, None, None
             
             total_records = len(records1) + len(records2)
-            if total_records > 100000:  # 合理的记录数量上限
+            if total_records > MAX_MERGE_RECORDS:
                 error_details["error_type"] = "too_many_records"
                 error_details["compatibility_issues"].append(f"合并后记录数量过多: {total_records}条")
-                return False, f"合并后记录数量过多({total_records}条)，请确认这是正确的抽卡记录文件", None, error_details
+                return False, f"合并后记录数量过多({total_records}条)，请确认这是正确的抽卡记录文件", None, error_details, None, None
             
             if total_records == 0:
                 error_details["error_type"] = "no_records"
                 error_details["compatibility_issues"].append("两个文件都没有抽卡记录")
-                return False, "两个文件都没有抽卡记录，无法进行合并", None, error_details
+                return False, "两个文件都没有抽卡记录，无法进行合并", None, error_details, None, None
+            
+            # 检查游戏类型兼容性
+            game_type_compatible, game_error = self._check_game_type_compatibility(data1, data2)
+            if not game_type_compatible:
+                error_details["error_type"] = "game_type_incompatible"
+                error_details["compatibility_issues"].append(game_error)
+                return False, f"游戏类型不兼容: {game_error}", None, error_details, None, None
             
             # 检查记录质量
             quality_issues = self._check_record_quality(records1, records2)
@@ -230,17 +270,17 @@ class FileMerger:
                 error_details["compatibility_issues"].extend(quality_issues)
                 # 质量问题不阻止合并，只是警告
             
-            return True, None, uid1, error_details
+            return True, None, uid1, error_details, data1, data2
             
         except PermissionError as e:
             error_details["error_type"] = "permission_error"
-            return False, f"权限不足，无法访问文件: {str(e)}", None, error_details
+            return False, f"权限不足，无法访问文件: {str(e)}", None, error_details, None, None
         except FileNotFoundError as e:
             error_details["error_type"] = "file_not_found"
-            return False, f"文件不存在: {str(e)}", None, error_details
+            return False, f"文件不存在: {str(e)}", None, error_details, None, None
         except Exception as e:
             error_details["error_type"] = "unknown_error"
-            return False, f"验证文件时发生未知错误: {str(e)}", None, error_details
+            return False, f"验证文件时发生未知错误: {str(e)}", None, error_details, None, None
     
     def merge_records(self, records1, records2):
         """
@@ -261,50 +301,41 @@ class FileMerger:
                 "file1_records": len(records1),
                 "file2_records": len(records2),
                 "duplicate_records": 0,
-                "unique_records": 0,
                 "total_merged_records": 0
             }
             
             # 使用字典来存储记录，以id为键进行去重
+            # 单次遍历两个文件的记录，先出现的记录优先（第一个文件优先）。
+            # 记录不再复制，调用方不应修改返回的记录
+            # 热循环中使用的全局名和方法预先绑定为局部变量
             merged_dict = {}
+            put = merged_dict.setdefault
+            _str = str
+            id_record_count = 0
             
-            # 处理第一个文件的记录
-            for record in records1:
-                if not isinstance(record, dict):
+            for record in chain(records1, records2):
+                # 几乎所有记录都是字典，用异常处理跳过非字典记录和缺少id的记录
+                try:
+                    record_id = record["id"]
+                except (TypeError, KeyError):
                     continue
-                
-                record_id = str(record.get("id", ""))
+                # 与结构验证和质量检查一致，空值id（None、空字符串、0等）视为缺失
                 if not record_id:
                     continue
+                # 绝大多数id已是字符串，跳过str()调用
+                key = record_id if record_id.__class__ is _str else _str(record_id)
                 
-                # 创建记录的副本以避免修改原始数据
-                record_copy = record.copy()
-                merged_dict[record_id] = record_copy
+                # setdefault单次查找完成去重，id已存在时保留现有记录
+                put(key, record)
+                id_record_count += 1
             
-            # 处理第二个文件的记录
-            for record in records2:
-                if not isinstance(record, dict):
-                    continue
-                
-                record_id = str(record.get("id", ""))
-                if not record_id:
-                    continue
-                
-                # 创建记录的副本
-                record_copy = record.copy()
-                
-                if record_id in merged_dict:
-                    # 发现重复记录，保留现有记录（第一个文件优先）
-                    stats["duplicate_records"] += 1
-                else:
-                    # 独有记录，添加到合并结果中
-                    merged_dict[record_id] = record_copy
+            # 同一个记录对象出现多次时也按重复计算，因此由数量差得出重复数
+            stats["duplicate_records"] = id_record_count - len(merged_dict)
             
             # 转换为列表
             merged_records = list(merged_dict.values())
             
             # 更新统计信息
-            stats["unique_records"] = len(merged_records) - stats["duplicate_records"]
             stats["total_merged_records"] = len(merged_records)
             
             return merged_records, stats
@@ -315,7 +346,6 @@ class FileMerger:
                 "file1_records": len(records1) if isinstance(records1, list) else 0,
                 "file2_records": len(records2) if isinstance(records2, list) else 0,
                 "duplicate_records": 0,
-                "unique_records": 0,
                 "total_merged_records": 0,
                 "error": str(e)
             }
@@ -339,12 +369,15 @@ class FileMerger:
             first_record = records[0]
             
             if 'id' in first_record and first_record['id']:
+                # 排序键的提取、下标排序和结果重排均由map/sorted在C层完成，不执行逐条记录的Python字节码
                 try:
                     # 尝试按数字排序
-                    return sorted(records, key=lambda x: int(x.get('id', '0')))
+                    keys = list(map(int, map(methodcaller('get', 'id', '0'), records)))
                 except (ValueError, TypeError):
                     # 如果id字段无法转换为整数，则按字符串排序
-                    return sorted(records, key=lambda x: str(x.get('id', '')))
+                    keys = list(map(str, map(methodcaller('get', 'id', ''), records)))
+                order = sorted(range(len(records)), key=keys.__getitem__)
+                return list(map(records.__getitem__, order))
             else:
                 # 如果没有id字段，使用time字段排序
                 return sorted(records, key=lambda x: str(x.get('time', '')))
@@ -365,30 +398,25 @@ class FileMerger:
             dict: 合并后的info字段
         """
         try:
-            # 基于第一个文件的info创建合并后的info
-            merged_info = info1.copy() if isinstance(info1, dict) else {}
-            
-            # 确保必需字段存在
-            if "uid" not in merged_info and isinstance(info2, dict) and "uid" in info2:
-                merged_info["uid"] = info2["uid"]
-            
-            if "lang" not in merged_info and isinstance(info2, dict) and "lang" in info2:
-                merged_info["lang"] = info2["lang"]
-            
-            # 设置导出应用信息
-            merged_info["export_app"] = "yunzai-uigf-splitter"
-            merged_info["export_app_version"] = "v1.1"
-            
-            # 设置格式版本信息
+            # 基于第一个文件的info创建合并后的info，缺少的必需字段从第二个文件补充
+            base_info = info1 if isinstance(info1, dict) else {}
+            fallback_info = {}
+            if isinstance(info2, dict):
+                fallback_info = {key: info2[key] for key in ("uid", "lang")
+                                 if key not in base_info and key in info2}
+            merged_info = {**base_info, **fallback_info}
+            
+            # 一次性设置导出应用信息、格式版本信息和导出时间
+            fixed_fields = {
+                "export_app": "yunzai-uigf-splitter",
+                "export_app_version": "v1.1"
+            }
             if self.game_type == GameConfig.GENSHIN_IMPACT:
-                merged_info["uigf_version"] = "v3.0"
+                fixed_fields["uigf_version"] = "v3.0"
             elif self.game_type == GameConfig.HONKAI_STAR_RAIL:
-                merged_info["srgf_version"] = "v1.0"
-            
-            # 更新导出时间为当前时间
-            from datetime import datetime
-            current_time = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            merged_info["export_time"] = current_time
+                fixed_fields["srgf_version"] = "v1.0"
+            fixed_fields["export_time"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            merged_info.update(fixed_fields)
             
             return merged_info
             
@@ -418,7 +446,6 @@ class FileMerger:
             
             # 设置当前时间
             try:
-                from datetime import datetime
                 basic_info["export_time"] = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
             except Exception:
                 basic_info["export_time"] = ""
@@ -447,7 +474,7 @@ class FileMerger:
             if progress_callback:
                 progress_callback(10, 100, "验证文件格式和UID...")
             
-            is_valid, error_msg, uid, error_details = self.validate_merge_files(file1_path, file2_path)
+            is_valid, error_msg, uid, error_details, data1, data2 = self._validate_and_load_merge_files(file1_path, file2_path)
             if not is_valid:
                 return False, error_msg, None
             
@@ -459,52 +486,43 @@ class FileMerger:
             if not success:
                 return False, error_msg, None
             
-            # 步骤3: 加载文件数据
-            if progress_callback:
-                progress_callback(30, 100, "加载文件数据...")
-            
-            try:
-                with open(file1_path, 'r', encoding='utf-8') as f:
-                    data1 = json.load(f)
-                
-                with open(file2_path, 'r', encoding='utf-8') as f:
-                    data2 = json.load(f)
-            except Exception as e:
-                return False, f"加载文件数据时发生错误: {str(e)}", None
-            
-            # 步骤4: 合并记录
+            # 步骤3: 合并记录（直接使用验证阶段已解析的数据）
             if progress_callback:
                 progress_callback(50, 100, "合并记录数据...")
             
             records1 = data1.get("list", [])
             records2 = data2.get("list", [])
+            info1 = data1.get("info", {})
+            info2 = data2.get("info", {})
             
             merged_records, merge_stats = self.merge_records(records1, records2)
             
+            # 合并后只需要info和合并结果，尽早释放两份原始数据树，
+            # 使重复记录和原列表在排序、序列化之前即可被回收，降低内存峰值
+            del data1, data2, records1, records2
+            
             if "error" in merge_stats:
                 return False, f"合并记录时发生错误: {merge_stats['error']}", None
             
-            # 步骤5: 排序记录
+            # 步骤4: 排序记录
             if progress_callback:
                 progress_callback(60, 100, "排序合并后的记录...")
             
             sorted_records = self.sort_records_by_id(merged_records)
             
-            # 步骤6: 创建合并后的info字段
+            # 步骤5: 创建合并后的info字段
             if progress_callback:
                 progress_callback(70, 100, "创建合并文件信息...")
             
-            info1 = data1.get("info", {})
-            info2 = data2.get("info", {})
             merged_info = self.create_merged_info(info1, info2)
             
-            # 步骤7: 构建合并后的数据结构
+            # 步骤6: 构建合并后的数据结构
             merged_data = {
                 "info": merged_info,
                 "list": sorted_records
             }
             
-            # 步骤8: 保存合并后的文件
+            # 步骤7: 保存合并后的文件
             if progress_callback:
                 progress_callback(80, 100, "保存合并后的文件...")
             
@@ -513,8 +531,8 @@ class FileMerger:
             merged_file_path = os.path.join(output_dir, merged_filename)
             
             try:
-                with open(merged_file_path, 'w', encoding='utf-8') as f:
-                    json.dump(merged_data, f, ensure_ascii=False, indent=2, separators=(',', ': '))
+                with open(merged_file_path, 'wb', buffering=JSON_WRITE_BUFFER_SIZE) as f:
+                    write_json_document(f, merged_info, sorted_records)
             except Exception as e:
                 return False, f"保存合并文件时发生错误: {str(e)}", None
             
@@ -531,7 +549,7 @@ class FileMerger:
                 "converted_files": []
             }
             
-            # 步骤9: 如果需要，进行合并后转换
+            # 步骤8: 如果需要，进行合并后转换
             if convert_after_merge:
                 if progress_callback:
                     progress_callback(90, 100, "执行合并后转换...")
@@ -560,7 +578,7 @@ class FileMerger:
                                 converted_files.append(f"{gacha_type}.json")
                         result_info["converted_files"] = converted_files
             
-            # 步骤10: 完成
+            # 步骤9: 完成
             if progress_callback:
                 progress_callback(100, 100, "合并完成")
             
@@ -613,14 +631,23 @@ class FileMerger:
             records1 = data1.get("list", [])
             records2 = data2.get("list", [])
             
-            invalid_gacha_types = []
+            # 错误信息只列出不同的无效值，收集到一定数量后即可停止扫描
+            max_reported_types = 5
+            gacha_type_set = self.gacha_type_set
+            invalid_gacha_types = {}  # 作为保持插入顺序的集合使用
             
-            for record in records1 + records2:
-                if isinstance(record, dict) and "gacha_type" in record:
-                    gacha_type = str(record["gacha_type"])
-                    if gacha_type not in self.gacha_types:
-                        if gacha_type not in invalid_gacha_types:
-                            invalid_gacha_types.append(gacha_type)
+            for record in chain(records1, records2):
+                # 跳过非字典记录和缺少gacha_type的记录
+                try:
+                    gacha_type = record["gacha_type"]
+                except (TypeError, KeyError):
+                    continue
+                if gacha_type.__class__ is not str:
+                    gacha_type = str(gacha_type)
+                if gacha_type not in gacha_type_set:
+                    invalid_gacha_types[gacha_type] = None
+                    if len(invalid_gacha_types) >= max_reported_types:
+                        break
             
             if invalid_gacha_types:
                 game_name = "原神" if self.game_type == GameConfig.GENSHIN_IMPACT else "崩坏星穹铁道"
@@ -645,24 +672,15 @@ class FileMerger:
         quality_issues = []
         
         try:
-            # 检查记录完整性
-            total_records = len(records1) + len(records2)
-            invalid_records = 0
-            missing_id_records = 0
-            missing_time_records = 0
-            
-            for records, file_name in [(records1, "文件1"), (records2, "文件2")]:
-                for i, record in enumerate(records):
-                    if not isinstance(record, dict):
-                        invalid_records += 1
-                        continue
-                    
-                    # 检查关键字段
-                    if not record.get("id"):
-                        missing_id_records += 1
-                    
-                    if not record.get("time"):
-                        missing_time_records += 1
+            # 每个文件只遍历一次，同时收集ID、时间和完整性统计
+            time_sample_size = 100  # 只检查前100条记录的时间
+            ids1, times1, invalid1, missing_id1, missing_time1 = self._scan_records(records1, time_sample_size)
+            ids2, times2, invalid2, missing_id2, missing_time2 = self._scan_records(
+                records2, time_sample_size - len(times1))
+            
+            invalid_records = invalid1 + invalid2
+            missing_id_records = missing_id1 + missing_id2
+            missing_time_records = missing_time1 + missing_time2
             
             # 记录质量问题
             if invalid_records > 0:
@@ -675,45 +693,24 @@ class FileMerger:
                 quality_issues.append(f"发现{missing_time_records}条记录缺少时间字段")
             
             # 检查记录时间范围
-            all_times = []
-            for records in [records1, records2]:
-                for record in records:
-                    if isinstance(record, dict) and record.get("time"):
-                        all_times.append(record["time"])
+            earliest = latest = None
+            for time_value in chain(times1, times2):
+                parsed_time = _parse_record_time(time_value)
+                if parsed_time is None:
+                    continue
+                if earliest is None or parsed_time < earliest:
+                    earliest = parsed_time
+                if latest is None or parsed_time > latest:
+                    latest = parsed_time
             
-            if all_times:
-                try:
-                    from datetime import datetime
-                    parsed_times = []
-                    for time_str in all_times[:100]:  # 只检查前100条记录的时间
-                        try:
-                            parsed_time = datetime.strptime(str(time_str), "%Y-%m-%d %H:%M:%S")
-                            parsed_times.append(parsed_time)
-                        except ValueError:
-                            continue
-                    
-                    if parsed_times:
-                        time_span = max(parsed_times) - min(parsed_times)
-                        if time_span.days > 365 * 3:  # 超过3年
-                            quality_issues.append(f"记录时间跨度较大（{time_span.days}天），请确认数据正确性")
-                        
-                except Exception:
-                    pass
+            if earliest is not None:
+                time_span = latest - earliest
+                if time_span.days > 365 * 3:  # 超过3年
+                    quality_issues.append(f"记录时间跨度较大（{time_span.days}天），请确认数据正确性")
             
             # 检查重复记录比例
             if records1 and records2:
-                ids1 = set()
-                ids2 = set()
-                
-                for record in records1:
-                    if isinstance(record, dict) and record.get("id"):
-                        ids1.add(str(record["id"]))
-                
-                for record in records2:
-                    if isinstance(record, dict) and record.get("id"):
-                        ids2.add(str(record["id"]))
-                
-                common_ids = ids1.intersection(ids2)
+                common_ids = ids1 & ids2
                 if common_ids:
                     overlap_ratio = len(common_ids) / max(len(ids1), len(ids2)) * 100
                     if overlap_ratio > 80:
@@ -722,4 +719,46 @@ class FileMerger:
         except Exception as e:
             quality_issues.append(f"质量检查过程中发生错误: {str(e)}")
         
-        return quality_issues
\ No newline at end of file
+        return quality_issues
+    
+    def _scan_records(self, records, time_limit):
+        """
+        单次遍历记录列表，收集质量检查所需的数据
+        
+        Args:
+            records (list): 记录列表
+            time_limit (int): 最多收集的时间值数量
+            
+        Returns:
+            tuple: (ids, times, invalid_count, missing_id_count, missing_time_count)
+                   ids (set): 记录中非空id的字符串集合
+                   times (list): 前time_limit个非空time值
+        """
+        ids = set()
+        times = []
+        invalid_count = 0
+        missing_id_count = 0
+        missing_time_count = 0
+        
+        for record in records:
+            # 非字典记录取下标时抛出TypeError，缺少id时抛出KeyError
+            try:
+                record_id = record["id"]
+            except TypeError:
+                invalid_count += 1
+                continue
+            except KeyError:
+                record_id = None
+            
+            if record_id:
+                ids.add(str(record_id))
+            else:
+                missing_id_count += 1
+            
+            time_value = record.get("time")
+            if not time_value:
+                missing_time_count += 1
+            elif len(times) < time_limit:
+                times.append(time_value)
+        
+        return ids, times, invalid_count, missing_id_count, missing_time_count
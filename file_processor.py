@@ -10,8 +10,37 @@ GitHub: https://github.com/maqibg/yunzai-uigf-splitte
 
 import json
 import os
+import stat
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from itertools import islice
+from operator import ge, itemgetter, lt, methodcaller
 from game_config import GameConfig
-from utils import validate_json_structure, create_output_directory, format_progress_message
+from utils import validate_json_structure, create_output_directory, format_progress_message, load_json_file, write_json_array, unique_output_stems, JSON_WRITE_BUFFER_SIZE
+
+# 单个文件记录数量的合理上限
+MAX_RECORDS = 50000
+
+# 预计输出小于该大小（10MB）时不检查磁盘剩余空间
+DISK_CHECK_MIN_SIZE = 10 * 1024 * 1024
+
+
+def _process_one(game_type, file_path, output_dir):
+    """
+    在工作进程中加载并分离单个文件
+    
+    Args:
+        game_type (str): 游戏类型 ("genshin" 或 "starrail")
+        file_path (str): 输入文件路径
+        output_dir (str): 该文件的输出目录路径
+        
+    Returns:
+        tuple: (success, error_message, stats)，与 process_records 相同
+    """
+    processor = FileProcessor(game_type)
+    data, error_message = processor.load_data(file_path)
+    if data is None:
+        return False, error_message, None
+    return processor.process_records(data, output_dir)
 
 
 class FileProcessor:
@@ -30,6 +59,59 @@ class FileProcessor:
         
         if not self.gacha_types:
             raise ValueError(f"不支持的游戏类型: {game_type}")
+        
+        # 每个支持的gacha_type到合并后目标类型的映射，一次查找同时完成有效性检查和合并
+        self._merge_map = {gacha_type: GameConfig.should_merge_gacha_type(game_type, gacha_type)
+                           for gacha_type in self.gacha_types}
+        # 合并后可能出现的目标类型（按配置顺序去重），用于预先创建分组
+        self._merge_targets = tuple(dict.fromkeys(self._merge_map.values()))
+    
+    @classmethod
+    def process_many(cls, game_type, file_paths, output_root, progress_callback=None, max_workers=None):
+        """
+        使用多个进程并行分离多个文件，每个文件输出到output_root下以文件名命名的子目录，
+        文件名重复时后出现的子目录名依次添加 _2、_3 等后缀
+        
+        Args:
+            game_type (str): 游戏类型 ("genshin" 或 "starrail")
+            file_paths (list): 输入文件路径列表
+            output_root (str): 输出根目录路径
+            progress_callback (callable): 进度回调函数，接收(current, total, message)参数，在调用进程中执行
+            max_workers (int): 最大进程数，默认为CPU核心数
+            
+        Returns:
+            list: 与file_paths顺序对应的(file_path, success, error_message, stats)列表
+        """
+        if not file_paths:
+            return []
+        
+        if not GameConfig.get_gacha_types(game_type):
+            raise ValueError(f"不支持的游戏类型: {game_type}")
+        
+        total = len(file_paths)
+        results = [None] * total
+        
+        # 同名文件依次加序号后缀，避免多个文件写入同一个子目录
+        output_dirs = [os.path.join(output_root, name) for name in unique_output_stems(file_paths)]
+        
+        with ProcessPoolExecutor(max_workers=min(max_workers or os.cpu_count() or 1, total)) as executor:
+            futures = {}
+            for index, file_path in enumerate(file_paths):
+                futures[executor.submit(_process_one, game_type, file_path, output_dirs[index])] = index
+            
+            for completed, future in enumerate(as_completed(futures), 1):
+                index = futures[future]
+                file_path = file_paths[index]
+                try:
+                    success, error_message, stats = future.result()
+                except Exception as e:
+                    success, error_message, stats = False, f"处理文件时发生错误: {str(e)}", None
+                results[index] = (file_path, success, error_message, stats)
+                
+                if progress_callback:
+                    progress_callback(completed, total, f"已处理 {completed}/{total} 个文件: {os.path.basename(file_path)}")
+        
+        return results
     
     def validate_file(self, file_path):
         """
@@ -43,97 +125,138 @@ class FileProcessor:
                    is_valid (bool): 是否有效
                    error_message (str): 错误信息，如果有效则为None
         """
+        data, error_message = self._load_and_validate(file_path)
+        return error_message is None, error_message
+    
+    def load_data(self, file_path):
+        """
+        加载JSON数据
+        
+        Args:
+            file_path (str): 文件路径
+            
+        Returns:
+            tuple: (data, error_message)
+                   data (dict): 加载的数据，如果失败则为None
+                   error_message (str): 错误信息，如果成功则为None
+        """
         try:
-            # 检查文件是否存在
-            if not os.path.exists(file_path):
-                return False, f"文件不存在: {file_path}"
+            # 验证与加载共用同一次解析结果
+            return self._load_and_validate(file_path)
             
-            # 检查是否为文件（而不是目录）
-            if not os.path.isfile(file_path):
-                return False, f"指定路径不是文件: {file_path}"
+        except Exception as e:
+            return None, f"加载文件时发生错误: {str(e)}"
+    
+    def _load_and_validate(self, file_path):
+        """
+        检查文件、解析JSON并验证数据，整个过程只解析一次文件
+        
+        Args:
+            file_path (str): 文件路径
             
-            # 检查文件大小
-            try:
-                file_size = os.path.getsize(file_path)
-                if file_size == 0:
-                    return False, "文件为空，请选择有效的抽卡记录文件"
-                if file_size > 100 * 1024 * 1024:  # 100MB限制
-                    return False, "文件过大（超过100MB），请确认这是正确的抽卡记录文件"
-            except OSError as e:
-                return False, f"无法获取文件大小: {str(e)}"
-            
-            # 检查文件扩展名
-            if not file_path.lower().endswith('.json'):
-                return False, "文件扩展名不正确，请选择.json格式的文件"
-            
-            # 检查文件是否可读
-            if not os.access(file_path, os.R_OK):
-                return False, f"文件不可读，请检查文件权限: {file_path}"
+        Returns:
+            tuple: (data, error_message)
+                   data (dict): 加载的数据，如果验证失败则为None
+                   error_message (str): 错误信息，如果有效则为None
+        """
+        try:
+            # 检查文件本身
+            is_valid, error_message = self._validate_metadata(file_path)
+            if not is_valid:
+                return None, error_message
             
             # 尝试加载JSON数据
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                data = load_json_file(file_path)
+            except PermissionError:
+                return None, f"文件不可读，请检查文件权限: {file_path}"
             except json.JSONDecodeError as e:
                 line_info = ""
                 if hasattr(e, 'lineno') and hasattr(e, 'colno'):
                     line_info = f" (第{e.lineno}行，第{e.colno}列)"
-                return False, f"JSON格式错误{line_info}: {e.msg}"
+                return None, f"JSON格式错误{line_info}: {e.msg}"
             except UnicodeDecodeError as e:
-                return False, f"文件编码错误，请确保文件使用UTF-8编码: {str(e)}"
+                return None, f"文件编码错误，请确保文件使用UTF-8编码: {str(e)}"
             except MemoryError:
-                return False, "文件过大，内存不足，无法加载文件"
+                return None, "文件过大，内存不足，无法加载文件"
             except Exception as e:
-                return False, f"读取文件时发生错误: {str(e)}"
+                return None, f"读取文件时发生错误: {str(e)}"
             
-            # 验证JSON结构
-            is_valid, error_message = validate_json_structure(data, self.game_type)
+            # 验证解析后的数据
+            is_valid, error_message = self._validate_parsed(data)
             if not is_valid:
-                return False, error_message
-            
-            # 额外验证：检查记录数量
-            if "list" in data and isinstance(data["list"], list):
-                record_count = len(data["list"])
-                if record_count == 0:
-                    return False, "文件中没有抽卡记录，请选择包含有效记录的文件"
-                elif record_count > 50000:  # 合理的记录数量上限
-                    return False, f"记录数量过多({record_count}条)，请确认这是正确的抽卡记录文件"
+                return None, error_message
             
-            return True, None
+            return data, None
             
         except PermissionError:
-            return False, f"权限不足，无法访问文件: {file_path}"
+            return None, f"权限不足，无法访问文件: {file_path}"
         except FileNotFoundError:
-            return False, f"文件不存在: {file_path}"
+            return None, f"文件不存在: {file_path}"
         except Exception as e:
-            return False, f"验证文件时发生未知错误: {str(e)}"
+            return None, f"验证文件时发生未知错误: {str(e)}"
     
-    def load_data(self, file_path):
+    def _validate_metadata(self, file_path):
         """
-        加载JSON数据
+        检查文件的存在性、类型、大小和扩展名，不读取文件内容
         
         Args:
             file_path (str): 文件路径
             
         Returns:
-            tuple: (data, error_message)
-                   data (dict): 加载的数据，如果失败则为None
-                   error_message (str): 错误信息，如果成功则为None
+            tuple: (is_valid, error_message)
         """
+        # 只获取一次文件状态信息，同时用于存在性、类型和大小检查
         try:
-            # 首先验证文件
-            is_valid, error_message = self.validate_file(file_path)
-            if not is_valid:
-                return None, error_message
-            
-            # 加载数据
-            with open(file_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            return data, None
+            file_stat = os.stat(file_path)
+        except FileNotFoundError:
+            return False, f"文件不存在: {file_path}"
+        except PermissionError:
+            return False, f"权限不足，无法访问文件: {file_path}"
+        except OSError as e:
+            return False, f"无法获取文件大小: {str(e)}"
+        
+        # 检查是否为文件（而不是目录）
+        if not stat.S_ISREG(file_stat.st_mode):
+            return False, f"指定路径不是文件: {file_path}"
+        
+        # 检查文件大小
+        file_size = file_stat.st_size
+        if file_size == 0:
+            return False, "文件为空，请选择有效的抽卡记录文件"
+        if file_size > 100 * 1024 * 1024:  # 100MB限制
+            return False, "文件过大（超过100MB），请确认这是正确的抽卡记录文件"
+        
+        # 检查文件扩展名
+        if not file_path.lower().endswith('.json'):
+            return False, "文件扩展名不正确，请选择.json格式的文件"
+        
+        # 文件是否可读不再预先检查，由打开文件时的PermissionError判断
+        return True, None
+    
+    def _validate_parsed(self, data):
+        """
+        验证解析后数据的结构和记录数量
+        
+        Args:
+            data: 解析后的JSON数据
             
-        except Exception as e:
-            return None, f"加载文件时发生错误: {str(e)}"
+        Returns:
+            tuple: (is_valid, error_message)
+        """
+        # 验证JSON结构
+        is_valid, error_message = validate_json_structure(data, self.game_type)
+        if not is_valid:
+            return False, error_message
+        
+        # 额外验证：检查记录数量（结构验证已保证list字段存在且为数组）
+        record_count = len(data["list"])
+        if record_count == 0:
+            return False, "文件中没有抽卡记录，请选择包含有效记录的文件"
+        elif record_count > MAX_RECORDS:
+            return False, f"记录数量过多({record_count}条)，请确认这是正确的抽卡记录文件"
+        
+        return True, None
     
     def process_records(self, data, output_dir, progress_callback=None):
         """
@@ -157,25 +280,38 @@ class FileProcessor:
                 return False, error_msg, None
             
             # 获取记录列表
-            if "list" not in data or not isinstance(data["list"], list):
+            records = data.get("list")
+            if not isinstance(records, list):
                 return False, "数据中没有有效的记录列表", None
             
-            records = data["list"]
+            # info缺失或不是字典时使用默认值
+            info = data.get("info", {})
+            if not isinstance(info, dict):
+                info = {}
+            
             total_records = len(records)
             
             if total_records == 0:
                 return True, None, {"total_records": 0, "processed_records": 0, "gacha_types": {}}
             
             # 从info中提取UID和其他信息
-            uid = ""
-            lang = "zh-cn"  # 默认语言
-            if "info" in data and isinstance(data["info"], dict):
-                info = data["info"]
-                uid = str(info.get("uid", ""))
-                lang = info.get("lang", "zh-cn")
-            
-            # 按gacha_type分组记录
-            records_by_type = {}
+            uid = str(info.get("uid", ""))
+            lang = info.get("lang", "zh-cn")  # 默认语言
+            
+            # 生成绑定了uid和默认语言的标准化函数
+            normalize_record = self._make_record_normalizer(uid, lang)
+            
+            # 循环中使用的属性和方法预先绑定为局部变量
+            get_target_gacha_type = self._merge_map.get
+            _str = str
+            
+            # 进度回调间隔：至少每100条记录一次，大文件总共约更新100次；
+            # 没有回调时下一次更新位置超出记录总数，循环中不会触发
+            report_interval = max(100, total_records // 100)
+            next_report = report_interval if progress_callback else total_records + 1
+            
+            # 按gacha_type分组记录，预先为所有目标类型创建分组，循环中无需判断分组是否存在
+            records_by_type = {gacha_type: [] for gacha_type in self._merge_targets}
             processed_count = 0
             skipped_count = 0
             
@@ -186,35 +322,32 @@ class FileProcessor:
                         skipped_count += 1
                         continue
                     
-                    original_gacha_type = str(record["gacha_type"])
-                    
-                    # 检查gacha_type是否在支持的列表中（合并前检查）
-                    if original_gacha_type not in self.gacha_types:
+                    # 检查gacha_type是否在支持的列表中（合并前检查）并获取合并后的目标类型，
+                    # 绝大多数gacha_type已是字符串，跳过str()调用
+                    original_gacha_type = record["gacha_type"]
+                    if original_gacha_type.__class__ is not _str:
+                        original_gacha_type = _str(original_gacha_type)
+                    target_gacha_type = get_target_gacha_type(original_gacha_type)
+                    if target_gacha_type is None:
                         skipped_count += 1
                         continue
                     
-                    # 应用gacha_type合并逻辑
-                    target_gacha_type = GameConfig.should_merge_gacha_type(self.game_type, original_gacha_type)
+                    # 创建标准化的记录，确保字段顺序和完整性
+                    processed_record = normalize_record(record)
                     
-                    # 如果需要合并，更新记录中的gacha_type字段
+                    # 如果需要合并，在标准化后的新记录上更新gacha_type字段，无需复制原始记录
                     if target_gacha_type != original_gacha_type:
-                        record = record.copy()  # 创建副本避免修改原始数据
-                        record["gacha_type"] = target_gacha_type
-                    
-                    # 创建标准化的记录，确保字段顺序和完整性
-                    processed_record = self._normalize_record(record, uid, lang)
+                        processed_record["gacha_type"] = target_gacha_type
                     
                     # 添加到对应的分组（使用target_gacha_type决定文件名）
-                    if target_gacha_type not in records_by_type:
-                        records_by_type[target_gacha_type] = []
-                    
                     records_by_type[target_gacha_type].append(processed_record)
                     processed_count += 1
                     
                     # 调用进度回调
-                    if progress_callback and (i + 1) % 100 == 0:  # 每100条记录更新一次进度
+                    if i >= next_report - 1:
                         message = format_progress_message(i + 1, total_records, "所有类型")
                         progress_callback(i + 1, total_records, message)
+                        next_report = i + 1 + report_interval
                 
                 except Exception as e:
                     # 记录处理错误，跳过这条记录
@@ -225,8 +358,11 @@ class FileProcessor:
             if progress_callback:
                 progress_callback(total_records, total_records, "记录处理完成")
             
+            # 去掉没有记录的分组
+            records_by_type = {gacha_type: type_records for gacha_type, type_records in records_by_type.items() if type_records}
+            
             # 保存分组后的记录
-            save_success, save_error = self.save_records_by_type(records_by_type, output_dir)
+            save_success, save_error = self.save_records_by_type(records_by_type, output_dir, processed_count)
             if not save_success:
                 return False, save_error, None
             
@@ -246,13 +382,14 @@ class FileProcessor:
         except Exception as e:
             return False, f"处理记录时发生错误: {str(e)}", None
     
-    def save_records_by_type(self, records_dict, output_dir):
+    def save_records_by_type(self, records_dict, output_dir, total_records=None):
         """
         按类型保存记录到文件
         
         Args:
             records_dict (dict): 按gacha_type分组的记录字典
             output_dir (str): 输出目录路径
+            total_records (int): 记录总数，调用方已知时传入，避免重新统计
             
         Returns:
             tuple: (success, error_message)
@@ -262,50 +399,29 @@ class FileProcessor:
         try:
             saved_files = []
             
-            # 检查磁盘空间
-            try:
-                import shutil
-                free_space = shutil.disk_usage(output_dir).free
-                # 估算需要的空间（每条记录大约500字节）
+            # 估算需要的空间（每条记录大约500字节）
+            if total_records is None:
                 total_records = sum(len(records) for records in records_dict.values())
-                estimated_size = total_records * 500  # 估算大小
-                
-                if free_space < estimated_size * 2:  # 保留2倍空间作为缓冲
-                    return False, f"磁盘空间不足。需要约{estimated_size // (1024*1024)}MB，剩余{free_space // (1024*1024)}MB"
-            except Exception:
-                # 如果无法检查磁盘空间，继续执行
-                pass
+            estimated_size = total_records * 500  # 估算大小
+            
+            # 检查磁盘空间，预计输出很小时跳过检查（写入失败时仍会给出磁盘空间不足的提示）
+            if estimated_size >= DISK_CHECK_MIN_SIZE:
+                try:
+                    import shutil
+                    free_space = shutil.disk_usage(output_dir).free
+                    
+                    if free_space < estimated_size * 2:  # 保留2倍空间作为缓冲
+                        return False, f"磁盘空间不足。需要约{estimated_size // (1024*1024)}MB，剩余{free_space // (1024*1024)}MB"
+                except Exception:
+                    # 如果无法检查磁盘空间，继续执行
+                    pass
             
             for gacha_type, records in records_dict.items():
                 if not records:  # 跳过空的记录列表
                     continue
                 
-                # 按id字段从大到小排序记录，如果没有id字段则按time字段排序
-                def sort_records(records_list):
-                    # 检查第一条记录来确定排序策略
-                    if not records_list:
-                        return records_list
-                    
-                    first_record = records_list[0]
-                    
-                    # 优先使用id字段排序
-                    if 'id' in first_record and first_record['id']:
-                        try:
-                            return sorted(records_list, key=lambda x: int(x.get('id', '0')), reverse=True)
-                        except (ValueError, TypeError):
-                            # 如果id字段无法转换为整数，则按字符串排序
-                            return sorted(records_list, key=lambda x: str(x.get('id', '')), reverse=True)
-                    
-                    # 如果没有id字段，使用time字段排序
-                    elif 'time' in first_record and first_record['time']:
-                        return sorted(records_list, key=lambda x: str(x.get('time', '')), reverse=True)
-                    
-                    # 如果既没有id也没有time字段，报错
-                    else:
-                        raise ValueError(f"记录缺少必要的排序字段（id或time）: {gacha_type}")
-                
                 try:
-                    sorted_records = sort_records(records)
+                    sorted_records = self._sort_records(records, gacha_type)
                 except ValueError as e:
                     return False, str(e)
                 
@@ -318,9 +434,9 @@ class FileProcessor:
                     return False, f"文件路径过长（超过260字符）：{file_path}"
                 
                 try:
-                    # 保存排序后的记录到JSON文件
-                    with open(file_path, 'w', encoding='utf-8') as f:
-                        json.dump(sorted_records, f, ensure_ascii=False, indent=2, separators=(',', ': '))
+                    # 保存排序后的记录到JSON文件，逐条序列化写入，不在内存中构建整个文件的内容
+                    with open(file_path, 'wb', buffering=JSON_WRITE_BUFFER_SIZE) as f:
+                        write_json_array(f, sorted_records)
                     
                     # 验证文件是否成功写入
                     if not os.path.exists(file_path):
@@ -361,6 +477,62 @@ class FileProcessor:
         except Exception as e:
             return False, f"保存记录时发生未知错误: {str(e)}"
     
+    def _sort_records(self, records_list, gacha_type):
+        """
+        按id字段从大到小排序记录，如果没有id字段则按time字段排序
+        
+        排序键一次性由map在C层提取后对下标排序，不逐条调用Python层的key函数。
+        
+        Args:
+            records_list (list): 同一gacha_type的记录列表
+            gacha_type (str): 抽卡类型，用于错误信息
+            
+        Returns:
+            list: 排序后的记录列表
+            
+        Raises:
+            ValueError: 记录缺少必要的排序字段
+        """
+        # 检查第一条记录来确定排序策略
+        if not records_list:
+            return records_list
+        
+        first_record = records_list[0]
+        
+        # 优先使用id字段排序
+        if 'id' in first_record and first_record['id']:
+            try:
+                # 标准化后的记录一定包含字符串id字段，直接按键取值，转换失败时可直接按字符串排序
+                ids = list(map(itemgetter('id'), records_list))
+                str_ids = ids
+            except KeyError:
+                # 未经标准化且缺少id字段的记录，按原有默认值处理
+                ids = list(map(methodcaller('get', 'id', '0'), records_list))
+                str_ids = list(map(methodcaller('get', 'id', ''), records_list))
+            try:
+                keys = list(map(int, ids))
+            except (ValueError, TypeError):
+                # 如果id字段无法转换为整数，则按字符串排序
+                keys = list(map(str, str_ids))
+        
+        # 如果没有id字段，使用time字段排序
+        elif 'time' in first_record and first_record['time']:
+            keys = list(map(str, map(methodcaller('get', 'time', ''), records_list)))
+        
+        # 如果既没有id也没有time字段，报错
+        else:
+            raise ValueError(f"记录缺少必要的排序字段（id或time）: {gacha_type}")
+        
+        # 导出的记录通常已按id有序：已是从大到小的顺序时无需排序，严格从小到大时直接反转
+        # （与稳定的降序排序结果相同）；两次检查都在遇到第一个逆序位置时停止
+        if all(map(ge, keys, islice(keys, 1, None))):
+            return records_list
+        if all(map(lt, keys, islice(keys, 1, None))):
+            return records_list[::-1]
+        
+        order = sorted(range(len(records_list)), key=keys.__getitem__, reverse=True)
+        return list(map(records_list.__getitem__, order))
+    
     def _normalize_record(self, record, uid, default_lang):
         """
         标准化记录格式，确保字段顺序和完整性
@@ -373,25 +545,46 @@ class FileProcessor:
         Returns:
             dict: 标准化后的记录
         """
-        # 按照示例格式创建记录，严格按照字段顺序
-        normalized = {
-            "uid": uid,
-            "gacha_type": str(record.get("gacha_type", "")),
-            "item_id": str(record.get("item_id", ""))
-        }
-        
-        # count字段为非必要项，只有原始数据中存在时才添加
-        if "count" in record:
-            normalized["count"] = str(record["count"])
-        
-        # 继续添加其他必要字段
-        normalized.update({
-            "time": str(record.get("time", "")),
-            "name": str(record.get("name", "")),
-            "lang": str(record.get("lang", default_lang)),  # 优先使用记录中的lang，否则使用默认值
-            "item_type": str(record.get("item_type", "")),
-            "rank_type": str(record.get("rank_type", "")),
-            "id": str(record.get("id", ""))
-        })
-        
-        return normalized
\ No newline at end of file
+        return self._make_record_normalizer(uid, default_lang)(record)
+    
+    def _make_record_normalizer(self, uid, default_lang):
+        """
+        生成绑定了uid和默认语言的记录标准化函数
+        
+        同一文件的所有记录共用uid和默认语言，生成一次后循环中只需传入记录本身，
+        函数内使用的名称均为闭包变量或局部变量。
+        
+        Args:
+            uid (str): 用户ID
+            default_lang (str): 默认语言设置（从info中提取）
+            
+        Returns:
+            callable: 接收原始记录，返回标准化后的记录
+        """
+        _str = str
+        
+        def normalize(record):
+            get = record.get
+            
+            # 按照示例格式创建记录，严格按照字段顺序
+            normalized = {
+                "uid": uid,
+                "gacha_type": _str(get("gacha_type", "")),
+                "item_id": _str(get("item_id", ""))
+            }
+            
+            # count字段为非必要项，只有原始数据中存在时才添加
+            if "count" in record:
+                normalized["count"] = _str(record["count"])
+            
+            # 继续添加其他必要字段（逐个赋值，不再构建临时字典）
+            normalized["time"] = _str(get("time", ""))
+            normalized["name"] = _str(get("name", ""))
+            normalized["lang"] = _str(get("lang", default_lang))  # 优先使用记录中的lang，否则使用默认值
+            normalized["item_type"] = _str(get("item_type", ""))
+            normalized["rank_type"] = _str(get("rank_type", ""))
+            normalized["id"] = _str(get("id", ""))
+            
+            return normalized
+        
+        return normalize
@@ -11,14 +11,174 @@ GitHub: https://github.com/maqibg/yunzai-uigf-splitte
 import json
 import os
 import re
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
+from functools import lru_cache
 from game_config import GameConfig
-from utils import validate_json_structure, create_output_directory, extract_uid_from_data, validate_record_fields, sanitize_filename, format_progress_message
+from utils import validate_json_structure, create_output_directory, extract_uid_from_data, validate_record_fields, sanitize_filename, format_progress_message, load_json_file, dump_json_bytes, unique_output_stems
+
+# 支持的时间格式（分隔符为"-"或"/"，时间部分可省略秒或整个省略）：
+#   %Y-%m-%d %H:%M:%S、%Y-%m-%d %H:%M、%Y-%m-%d 及对应的"/"分隔格式
+# 各字段的写法与 datetime.strptime 对这些指令接受的写法相同（包括一位数字和日期前的空格）
+_TIME_FORMAT_RE = re.compile(
+    r'(?P<year>\d\d\d\d)(?P<sep>[-/])(?P<month>1[0-2]|0[1-9]|[1-9])(?P=sep)'
+    r'(?P<day>3[01]|[12]\d|0[1-9]|[1-9]| [1-9])'
+    r'(?:\s+(?P<hour>2[0-3]|[0-1]\d|\d):(?P<minute>[0-5]\d|\d)(?::(?P<second>6[0-1]|[0-5]\d|\d))?)?'
+)
+
+# 导出文件中几乎所有时间都是补零的标准格式 %Y-%m-%d %H:%M:%S，先用只匹配这一种写法的简单正则检查
+_CANONICAL_TIME_RE = re.compile(r'\d{4}-\d\d-\d\d \d\d:\d\d:\d\d', re.ASCII)
+
+
+# 修复时间格式时的分隔符映射：日期分隔符统一为'-'，全角冒号替换为':'
+_TIME_SEPARATOR_TABLE = str.maketrans({'/': '-', '\\': '-', '.': '-', '：': ':'})
+
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# 常见错误时间格式（日期、时分、时分秒的各部分可为一位数字，日期和时间之间可用ISO 8601的"T"分隔）：
+#   2023-1-1 12:0:0、2023-1-1T12:0:0、2023-1-1 12:0、2023-1-1
+# 仅匹配ASCII数字，修复结果统一补零为 %Y-%m-%d %H:%M:%S 格式
+_TIME_SALVAGE_RE = re.compile(
+    r'(?P<year>\d{4})-(?P<month>\d{1,2})-(?P<day>\d{1,2})'
+    r'(?:(?:\s+|T)(?P<hour>\d{1,2}):(?P<minute>\d{1,2})(?::(?P<second>\d{1,2}))?)?',
+    re.ASCII
+)
+
+
+# 检查和修复结果的缓存容量：分析和修复各遍历一次记录，容量需覆盖整个文件中不同时间值的数量，
+# 第二次遍历才能命中第一次遍历的结果（十连抽的10条记录时间相同，约可覆盖65万条记录）
+_TIME_CACHE_SIZE = 65536
+
+
+# 同一文件中大量记录的时间值相同（同一次十连抽的记录时间一致），缓存检查和修复结果
+@lru_cache(maxsize=_TIME_CACHE_SIZE)
+def _is_valid_time_format(time_str):
+    """
+    检查时间格式是否有效
+    
+    Args:
+        time_str (str): 时间字符串
+        
+    Returns:
+        bool: 是否为有效格式
+    """
+    # 标准格式只需检查各字段的取值范围，交给C实现的fromisoformat解析；
+    # fromisoformat还接受时区、ISO周日期等写法，因此先用正则确认是标准格式
+    if _CANONICAL_TIME_RE.fullmatch(time_str) is not None:
+        try:
+            datetime.fromisoformat(time_str)
+        except ValueError:
+            return False
+        return True
+    
+    # 其他写法用一个正则匹配所有支持的格式（与逐个尝试strptime的结果一致），
+    # 再构造datetime检查日期和时间的取值范围，不再为每种不匹配的格式抛出并捕获异常
+    match = _TIME_FORMAT_RE.fullmatch(time_str)
+    if match is None:
+        return False
+    
+    year, month, day, hour, minute, second = match.group('year', 'month', 'day', 'hour', 'minute', 'second')
+    try:
+        datetime(int(year), int(month), int(day), int(hour or 0), int(minute or 0), int(second or 0))
+    except ValueError:
+        return False
+    
+    return True
+
+
+@lru_cache(maxsize=_TIME_CACHE_SIZE)
+def _fix_time_format(time_str):
+    """
+    修复时间格式
+    
+    Args:
+        time_str (str): 非空的时间字符串
+        
+    Returns:
+        tuple: (fixed_time, success)，与 FileRepairer.fix_time_format 相同
+    """
+    time_str = time_str.strip()
+    
+    # 如果已经是有效格式，直接返回
+    if _is_valid_time_format(time_str):
+        return time_str, True
+    
+    # 尝试各种修复策略
+    
+    # 1. 尝试解析时间戳
+    try:
+        # Unix时间戳（秒）
+        if time_str.isdigit() and len(time_str) == 10:
+            timestamp = int(time_str)
+            dt = datetime.fromtimestamp(timestamp)
+            return dt.strftime("%Y-%m-%d %H:%M:%S"), True
+        
+        # Unix时间戳（毫秒）
+        if time_str.isdigit() and len(time_str) == 13:
+            timestamp = int(time_str) / 1000
+            dt = datetime.fromtimestamp(timestamp)
+            return dt.strftime("%Y-%m-%d %H:%M:%S"), True
+    except (ValueError, OSError):
+        pass
+    
+    # 2. 尝试常见的错误格式修复
+    
+    # 修复日期和时间分隔符（单次字符映射）
+    time_str = time_str.translate(_TIME_SEPARATOR_TABLE)
+    
+    # 移除多余的空格
+    time_str = _WHITESPACE_RE.sub(' ', time_str)
+    
+    # 尝试匹配和修复常见格式
+    match = _TIME_SALVAGE_RE.match(time_str)
+    if match:
+        year, month, day, hour, minute, second = match.group('year', 'month', 'day', 'hour', 'minute', 'second')
+        if hour is None:
+            # 2023-1-1 -> 2023-01-01 00:00:00（只有日期时不能带有其他内容）
+            candidates = ((0, 0, 0),) if match.end() == len(time_str) else ()
+        elif second is None:
+            # 2023-1-1 12:0 -> 2023-01-01 12:00:00
+            candidates = ((int(hour), int(minute), 0),)
+        else:
+            # 2023-1-1 12:0:0 -> 2023-01-01 12:00:00，秒无效时按只有时分的写法修复
+            candidates = ((int(hour), int(minute), int(second)), (int(hour), int(minute), 0))
+        
+        for hour, minute, second in candidates:
+            # 构造datetime同时检查各字段的取值范围
+            try:
+                datetime(int(year), int(month), int(day), hour, minute, second)
+            except ValueError:
+                continue
+            return f"{year}-{int(month):02d}-{int(day):02d} {hour:02d}:{minute:02d}:{second:02d}", True
+    
+    # 3. 如果所有修复尝试都失败，返回默认时间
+    return "2023-01-01 00:00:00", False
+
+
+def _add_report_section(report_lines, title, items, line_template):
+    """
+    向报告中添加一节问题列表（列表为空时不添加）
+    
+    Args:
+        report_lines (list): 报告行列表
+        title (str): 小节标题
+        items (list): 问题列表
+        line_template (str): 每个问题的行模板，问题内容填入"{}"处
+    """
+    if items:
+        report_lines.append(title)
+        # 整个列表由map批量格式化，问题较多时避免逐条append
+        report_lines.extend(map(line_template.format, items))
+        report_lines.append("")
 
 
 class FileRepairer:
     """文件修复器类，负责检测和修复UIGF/SRGF格式文件中的问题"""
     
+    # 记录中应该是字符串的字段
+    _STRING_FIELDS = ("gacha_type", "time", "name", "item_type", "rank_type", "id", "uid", "lang", "item_id", "count")
+    
     def __init__(self, game_type):
         """
         初始化文件修复器
@@ -33,13 +193,22 @@ class FileRepairer:
         if not self.gacha_types:
             raise ValueError(f"不支持的游戏类型: {game_type}")
         
+        # 用于逐条记录判断gacha_type是否有效的集合
+        self.gacha_type_set = frozenset(map(str, self.gacha_types))
+        
+        # info字段的默认值
+        self.info_defaults = GameConfig.get_info_defaults(game_type)
+        
         # 定义必需字段
-        self.required_info_fields = ["uid", "lang", "export_time"]
-        self.required_record_fields = ["gacha_type", "time", "name", "item_type", "rank_type", "id"]
+        self.required_info_fields = ("uid", "lang", "export_time")
+        self.required_record_fields = ("gacha_type", "time", "name", "item_type", "rank_type", "id")
         
         # 添加游戏特定的版本字段
         if self.format_info:
-            self.required_info_fields.append(self.format_info["version_field"])
+            self.required_info_fields += (self.format_info["version_field"],)
+        
+        # 按当前游戏类型生成的记录分析函数
+        self._analyze_records = self._make_record_analyzer()
     
     def analyze_file_issues(self, file_path):
         """
@@ -79,8 +248,7 @@ class FileRepairer:
             
             # 尝试加载JSON数据
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                data = load_json_file(file_path)
             except json.JSONDecodeError as e:
                 issues["file_errors"].append(f"JSON格式错误: {e.msg}")
                 return issues, None
@@ -134,9 +302,12 @@ class FileRepairer:
         for field in self.required_info_fields:
             if field not in info:
                 issues["info_errors"].append(f"info中缺少{field}字段")
-            elif not info[field] or str(info[field]).strip() == "":
+                continue
+            
+            value = info[field]
+            if not value or not str(value).strip():
                 issues["info_errors"].append(f"info中{field}字段为空")
-            elif not isinstance(info[field], str):
+            elif not isinstance(value, str):
                 issues["data_type_errors"].append(f"info中{field}字段应为字符串类型")
     
     def _analyze_record_issues(self, records, issues):
@@ -150,45 +321,84 @@ class FileRepairer:
         if not records:
             return
         
-        seen_ids = set()
+        self._analyze_records(records, issues)
+    
+    def _make_record_analyzer(self):
+        """
+        生成绑定了当前游戏类型字段列表和gacha_type集合的记录分析函数
         
-        for i, record in enumerate(records):
-            record_index = i + 1
-            
-            # 检查记录是否为对象
-            if not isinstance(record, dict):
-                issues["record_errors"].append(f"第{record_index}条记录必须是对象")
-                continue
-            
-            # 检查必需字段
-            for field in self.required_record_fields:
-                if field not in record:
-                    issues["record_errors"].append(f"第{record_index}条记录缺少{field}字段")
-                elif field in ["gacha_type", "time", "id"] and (not record[field] or str(record[field]).strip() == ""):
-                    issues["record_errors"].append(f"第{record_index}条记录{field}字段为空")
-            
-            # 检查数据类型
-            self._check_record_data_types(record, record_index, issues)
-            
-            # 检查gacha_type是否有效
-            if "gacha_type" in record and record["gacha_type"]:
-                gacha_type = str(record["gacha_type"])
-                if gacha_type not in self.gacha_types:
-                    issues["record_errors"].append(f"第{record_index}条记录gacha_type '{gacha_type}' 不是有效类型")
-            
-            # 检查时间格式
-            if "time" in record and record["time"]:
-                time_str = str(record["time"])
-                if not self._is_valid_time_format(time_str):
-                    issues["time_format_errors"].append(f"第{record_index}条记录时间格式错误: {time_str}")
-            
-            # 检查重复ID
-            if "id" in record and record["id"]:
-                record_id = str(record["id"])
-                if record_id in seen_ids:
-                    issues["duplicate_ids"].append(f"第{record_index}条记录ID重复: {record_id}")
+        游戏相关的数据在初始化时确定，生成一次后分析函数内使用的名称均为闭包变量或局部变量。
+        
+        Returns:
+            callable: 接收(records, issues)，与 _analyze_record_issues 相同
+        """
+        required_fields = self.required_record_fields
+        required_field_set = frozenset(required_fields)
+        # 不能为空的必需字段（按必需字段的顺序）
+        non_empty_fields = tuple(field for field in required_fields if field in ("gacha_type", "time", "id"))
+        gacha_types = self.gacha_type_set
+        is_valid_time = self._is_valid_time_format
+        check_data_types = self._check_record_data_types
+        is_str = str.__instancecheck__
+        _str = str
+        _isinstance = isinstance
+        _dict = dict
+        
+        def analyze(records, issues):
+            seen_ids = set()
+            record_errors = issues["record_errors"]
+            duplicate_ids = issues["duplicate_ids"]
+            time_format_errors = issues["time_format_errors"]
+            
+            for record_index, record in enumerate(records, 1):
+                # 检查记录是否为对象
+                if not _isinstance(record, _dict):
+                    record_errors.append(f"第{record_index}条记录必须是对象")
+                    continue
+                
+                # 检查必需字段：字段齐全时（绝大多数记录）只需检查不能为空的字段
+                if record.keys() >= required_field_set:
+                    for field in non_empty_fields:
+                        value = record[field]
+                        if not value or not _str(value).strip():
+                            record_errors.append(f"第{record_index}条记录{field}字段为空")
                 else:
-                    seen_ids.add(record_id)
+                    for field in required_fields:
+                        if field not in record:
+                            record_errors.append(f"第{record_index}条记录缺少{field}字段")
+                        elif field in non_empty_fields:
+                            value = record[field]
+                            if not value or not _str(value).strip():
+                                record_errors.append(f"第{record_index}条记录{field}字段为空")
+                
+                # 检查数据类型：所有字段值都是字符串时（绝大多数记录）一次探测即可跳过逐字段检查
+                if not all(map(is_str, record.values())):
+                    check_data_types(record, record_index, issues)
+                
+                # 检查gacha_type是否有效
+                gacha_type = record.get("gacha_type")
+                if gacha_type:
+                    gacha_type = _str(gacha_type)
+                    if gacha_type not in gacha_types:
+                        record_errors.append(f"第{record_index}条记录gacha_type '{gacha_type}' 不是有效类型")
+                
+                # 检查时间格式
+                time_value = record.get("time")
+                if time_value:
+                    time_str = _str(time_value)
+                    if not is_valid_time(time_str):
+                        time_format_errors.append(f"第{record_index}条记录时间格式错误: {time_str}")
+                
+                # 检查重复ID
+                record_id = record.get("id")
+                if record_id:
+                    record_id = _str(record_id)
+                    if record_id in seen_ids:
+                        duplicate_ids.append(f"第{record_index}条记录ID重复: {record_id}")
+                    else:
+                        seen_ids.add(record_id)
+        
+        return analyze
     
     def _check_record_data_types(self, record, record_index, issues):
         """
@@ -199,13 +409,10 @@ class FileRepairer:
             record_index (int): 记录索引
             issues (dict): 问题列表字典
         """
-        # 应该是字符串的字段
-        string_fields = ["gacha_type", "time", "name", "item_type", "rank_type", "id", "uid", "lang", "item_id", "count"]
-        
-        for field in string_fields:
-            if field in record and record[field] is not None:
-                if not isinstance(record[field], str):
-                    issues["data_type_errors"].append(f"第{record_index}条记录{field}字段应为字符串类型")
+        for field in self._STRING_FIELDS:
+            value = record.get(field)
+            if value is not None and not isinstance(value, str):
+                issues["data_type_errors"].append(f"第{record_index}条记录{field}字段应为字符串类型")
     
     def _is_valid_time_format(self, time_str):
         """
@@ -217,63 +424,149 @@ class FileRepairer:
         Returns:
             bool: 是否为有效格式
         """
-        # 支持的时间格式
-        time_formats = [
-            "%Y-%m-%d %H:%M:%S",  # 2023-01-01 12:00:00
-            "%Y-%m-%d %H:%M",     # 2023-01-01 12:00
-            "%Y/%m/%d %H:%M:%S",  # 2023/01/01 12:00:00
-            "%Y/%m/%d %H:%M",     # 2023/01/01 12:00
-            "%Y-%m-%d",           # 2023-01-01
-            "%Y/%m/%d"            # 2023/01/01
-        ]
-        
-        for fmt in time_formats:
-            try:
-                datetime.strptime(time_str, fmt)
-                return True
-            except ValueError:
-                continue
-        
-        return False
+        return _is_valid_time_format(time_str)
     
-    def detect_missing_fields(self, data):
+    def detect_all(self, data, checks=None):
         """
-        检测缺失必需字段的功能
+        单次遍历记录列表，同时检测缺失字段、无效数据类型、重复ID和时间格式错误
+        
+        需要多种检测结果时应直接调用本方法，只需一次遍历；各detect_*方法只执行各自的检测。
         
         Args:
             data (dict): 数据对象
+            checks (tuple): 要执行的检测（下列键名），默认为全部
             
         Returns:
-            list: 缺失字段的详细信息列表
+            dict: 检测结果，包含以下键（值与对应的detect_*方法返回值相同，未执行的检测为空列表）
+                  missing_fields (list): 缺失字段的详细信息列表
+                  invalid_types (list): 无效数据类型的详细信息列表
+                  duplicates (list): 重复ID的详细信息列表
+                  time_errors (list): 时间格式错误的详细信息列表
         """
         missing_fields = []
+        invalid_types = []
+        duplicates = []
+        time_errors = []
+        
+        if checks is None:
+            check_missing = check_types = check_duplicates = check_time = True
+        else:
+            check_missing = "missing_fields" in checks
+            check_types = "invalid_types" in checks
+            check_duplicates = "duplicates" in checks
+            check_time = "time_errors" in checks
         
         # 检查info字段
         if "info" in data and isinstance(data["info"], dict):
             info = data["info"]
-            for field in self.required_info_fields:
-                if field not in info or not info[field] or str(info[field]).strip() == "":
-                    missing_fields.append({
-                        "type": "info",
-                        "field": field,
-                        "location": "info字段"
-                    })
+            if check_missing:
+                for field in self.required_info_fields:
+                    value = info.get(field)
+                    if not value or not str(value).strip():
+                        missing_fields.append({
+                            "type": "info",
+                            "field": field,
+                            "location": "info字段"
+                        })
+            
+            if check_types:
+                for field in self.required_info_fields:
+                    value = info.get(field)
+                    if value is not None and not isinstance(value, str):
+                        invalid_types.append({
+                            "type": "info",
+                            "field": field,
+                            "location": "info字段",
+                            "current_type": type(value).__name__,
+                            "expected_type": "str"
+                        })
         
         # 检查记录字段
         if "list" in data and isinstance(data["list"], list):
+            required_fields = self.required_record_fields
+            string_fields = self._STRING_FIELDS
+            is_valid_time = self._is_valid_time_format
+            is_str = str.__instancecheck__
+            id_locations = defaultdict(list)  # id -> [record_indices]
+            
             for i, record in enumerate(data["list"]):
-                if isinstance(record, dict):
-                    for field in self.required_record_fields:
-                        if field not in record or (field in ["gacha_type", "time", "id"] and 
-                                                 (not record[field] or str(record[field]).strip() == "")):
+                if not isinstance(record, dict):
+                    continue
+                
+                location = f"第{i+1}条记录"
+                
+                # 缺失或为空的必需字段
+                if check_missing:
+                    for field in required_fields:
+                        value = record.get(field)
+                        if field not in record or (field in ("gacha_type", "time", "id") and
+                                                 (not value or not str(value).strip())):
                             missing_fields.append({
                                 "type": "record",
                                 "field": field,
-                                "location": f"第{i+1}条记录",
+                                "location": location,
                                 "record_index": i
                             })
+                
+                # 不是字符串类型的字段（所有字段值都是字符串时跳过逐字段检查）
+                if check_types and not all(map(is_str, record.values())):
+                    for field in string_fields:
+                        value = record.get(field)
+                        if value is not None and not isinstance(value, str):
+                            invalid_types.append({
+                                "type": "record",
+                                "field": field,
+                                "location": location,
+                                "record_index": i,
+                                "current_type": type(value).__name__,
+                                "expected_type": "str"
+                            })
+                
+                if check_duplicates:
+                    record_id = record.get("id")
+                    if record_id:
+                        id_locations[str(record_id)].append(i)
+                
+                # 时间格式
+                if check_time:
+                    time_value = record.get("time")
+                    if time_value:
+                        time_str = str(time_value)
+                        if not is_valid_time(time_str):
+                            time_errors.append({
+                                "location": location,
+                                "record_index": i,
+                                "invalid_time": time_str,
+                                "field": "time"
+                            })
+            
+            # 找出重复的ID
+            for record_id, indices in id_locations.items():
+                if len(indices) > 1:
+                    duplicates.append({
+                        "id": record_id,
+                        "locations": [f"第{i+1}条记录" for i in indices],
+                        "record_indices": indices
+                    })
+        
+        return {
+            "missing_fields": missing_fields,
+            "invalid_types": invalid_types,
+            "duplicates": duplicates,
+            "time_errors": time_errors
+        }
+    
+    def detect_missing_fields(self, data):
+        """
+        检测缺失必需字段的功能
         
-        return missing_fields
+        Args:
+            data (dict): 数据对象
+            
+        Returns:
+            list: 缺失字段的详细信息列表
+        """
+        return self.detect_all(data, ("missing_fields",))["missing_fields"]
     
     def detect_invalid_data_types(self, data):
         """
@@ -285,39 +578,7 @@ class FileRepairer:
         Returns:
             list: 无效数据类型的详细信息列表
         """
-        invalid_types = []
-        
-        # 检查info字段数据类型
-        if "info" in data and isinstance(data["info"], dict):
-            info = data["info"]
-            for field in self.required_info_fields:
-                if field in info and info[field] is not None and not isinstance(info[field], str):
-                    invalid_types.append({
-                        "type": "info",
-                        "field": field,
-                        "location": "info字段",
-                        "current_type": type(info[field]).__name__,
-                        "expected_type": "str"
-                    })
-        
-        # 检查记录字段数据类型
-        if "list" in data and isinstance(data["list"], list):
-            string_fields = ["gacha_type", "time", "name", "item_type", "rank_type", "id", "uid", "lang", "item_id", "count"]
-            
-            for i, record in enumerate(data["list"]):
-                if isinstance(record, dict):
-                    for field in string_fields:
-                        if field in record and record[field] is not None and not isinstance(record[field], str):
-                            invalid_types.append({
-                                "type": "record",
-                                "field": field,
-                                "location": f"第{i+1}条记录",
-                                "record_index": i,
-                                "current_type": type(record[field]).__name__,
-                                "expected_type": "str"
-                            })
-        
-        return invalid_types
+        return self.detect_all(data, ("invalid_types",))["invalid_types"]
     
     def detect_duplicate_ids(self, data):
         """
@@ -329,30 +590,7 @@ class FileRepairer:
         Returns:
             list: 重复ID的详细信息列表
         """
-        duplicates = []
-        
-        if "list" not in data or not isinstance(data["list"], list):
-            return duplicates
-        
-        id_locations = {}  # id -> [record_indices]
-        
-        for i, record in enumerate(data["list"]):
-            if isinstance(record, dict) and "id" in record and record["id"]:
-                record_id = str(record["id"])
-                if record_id not in id_locations:
-                    id_locations[record_id] = []
-                id_locations[record_id].append(i)
-        
-        # 找出重复的ID
-        for record_id, indices in id_locations.items():
-            if len(indices) > 1:
-                duplicates.append({
-                    "id": record_id,
-                    "locations": [f"第{i+1}条记录" for i in indices],
-                    "record_indices": indices
-                })
-        
-        return duplicates
+        return self.detect_all(data, ("duplicates",))["duplicates"]
     
     def detect_time_format_errors(self, data):
         """
@@ -364,23 +602,7 @@ class FileRepairer:
         Returns:
             list: 时间格式错误的详细信息列表
         """
-        time_errors = []
-        
-        if "list" not in data or not isinstance(data["list"], list):
-            return time_errors
-        
-        for i, record in enumerate(data["list"]):
-            if isinstance(record, dict) and "time" in record and record["time"]:
-                time_str = str(record["time"])
-                if not self._is_valid_time_format(time_str):
-                    time_errors.append({
-                        "location": f"第{i+1}条记录",
-                        "record_index": i,
-                        "invalid_time": time_str,
-                        "field": "time"
-                    })
-        
-        return time_errors
+        return self.detect_all(data, ("time_errors",))["time_errors"]
     
     def fix_missing_fields(self, record, default_values, record_index=None):
         """
@@ -397,72 +619,95 @@ class FileRepairer:
                    fixes_applied (list): 应用的修复列表
         """
         fixed_record = record.copy()
+        return fixed_record, self._fix_missing_fields_inplace(fixed_record, default_values, record_index)
+    
+    def fix_data_types(self, record):
+        """
+        修复数据类型错误
+        
+        Args:
+            record (dict): 记录对象
+            
+        Returns:
+            tuple: (fixed_record, fixes_applied)
+                   fixed_record (dict): 修复后的记录
+                   fixes_applied (list): 应用的修复列表
+        """
+        fixed_record = record.copy()
+        return fixed_record, self._fix_data_types_inplace(fixed_record)
+    
+    def _fix_missing_fields_inplace(self, record, default_values, record_index=None):
+        """
+        直接在记录对象上修复缺失字段
+        
+        Args:
+            record (dict): 记录对象，修复结果直接写入该对象
+            default_values (dict): 默认值字典
+            record_index (int): 记录索引（用于生成默认ID）
+            
+        Returns:
+            list: 应用的修复列表
+        """
         fixes_applied = []
         
         # 修复缺失的必需字段
         for field in self.required_record_fields:
-            if field not in fixed_record or not fixed_record[field] or str(fixed_record[field]).strip() == "":
+            value = record.get(field)
+            if not value or not str(value).strip():
                 if field in default_values:
-                    fixed_record[field] = default_values[field]
+                    record[field] = default_values[field]
                     fixes_applied.append(f"添加缺失字段 {field}: {default_values[field]}")
                 else:
                     # 使用智能默认值
-                    default_value = self._get_smart_default_value(field, fixed_record, record_index)
+                    default_value = self._get_smart_default_value(field, record, record_index)
                     if default_value is not None:
-                        fixed_record[field] = default_value
+                        record[field] = default_value
                         fixes_applied.append(f"添加缺失字段 {field}: {default_value}")
         
         # 确保可选字段也有合理的默认值
         optional_fields = ["uid", "lang", "item_id", "count"]
         for field in optional_fields:
-            if field not in fixed_record or not fixed_record[field]:
+            if not record.get(field):
                 if field in default_values:
-                    fixed_record[field] = default_values[field]
+                    record[field] = default_values[field]
                     fixes_applied.append(f"添加可选字段 {field}: {default_values[field]}")
                 else:
-                    default_value = self._get_smart_default_value(field, fixed_record, record_index)
+                    default_value = self._get_smart_default_value(field, record, record_index)
                     if default_value is not None:
-                        fixed_record[field] = default_value
+                        record[field] = default_value
                         fixes_applied.append(f"添加可选字段 {field}: {default_value}")
         
-        return fixed_record, fixes_applied
+        return fixes_applied
     
-    def fix_data_types(self, record):
+    def _fix_data_types_inplace(self, record):
         """
-        修复数据类型错误
+        直接在记录对象上修复数据类型错误
         
         Args:
-            record (dict): 记录对象
+            record (dict): 记录对象，修复结果直接写入该对象
             
         Returns:
-            tuple: (fixed_record, fixes_applied)
-                   fixed_record (dict): 修复后的记录
-                   fixes_applied (list): 应用的修复列表
+            list: 应用的修复列表
         """
-        fixed_record = record.copy()
         fixes_applied = []
         
-        # 应该是字符串的字段
-        string_fields = ["gacha_type", "time", "name", "item_type", "rank_type", "id", "uid", "lang", "item_id", "count"]
-        
-        for field in string_fields:
-            if field in fixed_record and fixed_record[field] is not None:
-                if not isinstance(fixed_record[field], str):
-                    old_value = fixed_record[field]
-                    old_type = type(old_value).__name__
-                    
-                    # 转换为字符串
-                    try:
-                        fixed_record[field] = str(old_value)
-                        fixes_applied.append(f"转换字段 {field} 从 {old_type} 到 str: {old_value} -> {fixed_record[field]}")
-                    except Exception as e:
-                        # 如果转换失败，使用默认值
-                        default_value = self._get_smart_default_value(field, fixed_record)
-                        if default_value is not None:
-                            fixed_record[field] = default_value
-                            fixes_applied.append(f"转换字段 {field} 失败，使用默认值: {default_value}")
-        
-        return fixed_record, fixes_applied
+        for field in self._STRING_FIELDS:
+            old_value = record.get(field)
+            if old_value is not None and not isinstance(old_value, str):
+                old_type = type(old_value).__name__
+                
+                # 转换为字符串
+                try:
+                    record[field] = str(old_value)
+                    fixes_applied.append(f"转换字段 {field} 从 {old_type} 到 str: {old_value} -> {record[field]}")
+                except Exception as e:
+                    # 如果转换失败，使用默认值
+                    default_value = self._get_smart_default_value(field, record)
+                    if default_value is not None:
+                        record[field] = default_value
+                        fixes_applied.append(f"转换字段 {field} 失败，使用默认值: {default_value}")
+        
+        return fixes_applied
     
     def fix_time_format(self, time_str):
         """
@@ -479,68 +724,7 @@ class FileRepairer:
         if not time_str or not isinstance(time_str, str):
             return "2023-01-01 00:00:00", False
         
-        time_str = time_str.strip()
-        
-        # 如果已经是有效格式，直接返回
-        if self._is_valid_time_format(time_str):
-            return time_str, True
-        
-        # 尝试各种修复策略
-        
-        # 1. 尝试解析时间戳
-        try:
-            # Unix时间戳（秒）
-            if time_str.isdigit() and len(time_str) == 10:
-                timestamp = int(time_str)
-                dt = datetime.fromtimestamp(timestamp)
-                return dt.strftime("%Y-%m-%d %H:%M:%S"), True
-            
-            # Unix时间戳（毫秒）
-            if time_str.isdigit() and len(time_str) == 13:
-                timestamp = int(time_str) / 1000
-                dt = datetime.fromtimestamp(timestamp)
-                return dt.strftime("%Y-%m-%d %H:%M:%S"), True
-        except (ValueError, OSError):
-            pass
-        
-        # 2. 尝试常见的错误格式修复
-        
-        # 修复日期分隔符
-        time_str = re.sub(r'[/\\.]', '-', time_str)
-        
-        # 修复时间分隔符
-        time_str = re.sub(r'[：]', ':', time_str)
-        
-        # 移除多余的空格
-        time_str = re.sub(r'\s+', ' ', time_str)
-        
-        # 尝试匹配和修复常见格式
-        patterns = [
-            # 2023-1-1 12:0:0 -> 2023-01-01 12:00:00
-            (r'(\d{4})-(\d{1,2})-(\d{1,2})\s+(\d{1,2}):(\d{1,2}):(\d{1,2})', 
-             lambda m: f"{m.group(1)}-{m.group(2).zfill(2)}-{m.group(3).zfill(2)} {m.group(4).zfill(2)}:{m.group(5).zfill(2)}:{m.group(6).zfill(2)}"),
-            
-            # 2023-1-1 12:0 -> 2023-01-01 12:00:00
-            (r'(\d{4})-(\d{1,2})-(\d{1,2})\s+(\d{1,2}):(\d{1,2})', 
-             lambda m: f"{m.group(1)}-{m.group(2).zfill(2)}-{m.group(3).zfill(2)} {m.group(4).zfill(2)}:{m.group(5).zfill(2)}:00"),
-            
-            # 2023-1-1 -> 2023-01-01 00:00:00
-            (r'(\d{4})-(\d{1,2})-(\d{1,2})$', 
-             lambda m: f"{m.group(1)}-{m.group(2).zfill(2)}-{m.group(3).zfill(2)} 00:00:00"),
-        ]
-        
-        for pattern, replacement in patterns:
-            match = re.match(pattern, time_str)
-            if match:
-                try:
-                    fixed_time = replacement(match)
-                    if self._is_valid_time_format(fixed_time):
-                        return fixed_time, True
-                except Exception:
-                    continue
-        
-        # 3. 如果所有修复尝试都失败，返回默认时间
-        return "2023-01-01 00:00:00", False
+        return _fix_time_format(time_str)
     
     def remove_duplicates(self, records):
         """
@@ -557,25 +741,39 @@ class FileRepairer:
         if not records:
             return [], 0
         
-        seen_ids = set()
+        # 常见情况：所有记录都带有非空的字符串ID，用推导式、集合和字典整批完成去重
+        try:
+            ids = [record["id"] for record in records]
+        except (TypeError, KeyError):
+            ids = None
+        
+        if ids is not None and set(map(type, ids)) == {str} and "" not in ids:
+            total = len(records)
+            if len(set(ids)) == total:
+                return list(records), 0
+            
+            # 倒序写入字典后每个id保留的是最小下标，即第一次出现的位置
+            first_index = dict(zip(reversed(ids), range(total - 1, -1, -1)))
+            unique_records = list(map(records.__getitem__, sorted(first_index.values())))
+            return unique_records, total - len(unique_records)
+        
+        # setdefault单次查找完成去重：返回值等于当前记录的下标说明该id第一次出现
+        seen_ids = {}
+        put = seen_ids.setdefault
         unique_records = []
-        removed_count = 0
+        append = unique_records.append
         
-        for record in records:
+        for index, record in enumerate(records):
             if not isinstance(record, dict) or "id" not in record or not record["id"]:
                 # 没有ID的记录保留
-                unique_records.append(record)
+                append(record)
                 continue
             
-            record_id = str(record["id"])
-            
-            if record_id not in seen_ids:
-                seen_ids.add(record_id)
-                unique_records.append(record)
-            else:
-                removed_count += 1
+            record_id = record["id"]
+            if put(record_id if record_id.__class__ is str else str(record_id), index) == index:
+                append(record)
         
-        return unique_records, removed_count
+        return unique_records, len(records) - len(unique_records)
     
     def _get_smart_default_value(self, field, record, record_index=None):
         """
@@ -640,117 +838,58 @@ class FileRepairer:
             str: 修复报告文本
         """
         report_lines = []
-        report_lines.append("=" * 60)
-        report_lines.append("UIGF/SRGF 文件修复报告")
-        report_lines.append("=" * 60)
-        report_lines.append(f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        report_lines.append(f"游戏类型: {self.format_info['format_name'] if self.format_info else '未知'}")
-        report_lines.append("")
+        append = report_lines.append
+        
+        append("=" * 60)
+        append("UIGF/SRGF 文件修复报告")
+        append("=" * 60)
+        append(f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        append(f"游戏类型: {self.format_info['format_name'] if self.format_info else '未知'}")
+        append("")
         
         # 统计信息
         total_issues_found = sum(len(issues) for issues in issues_found.values())
         total_issues_fixed = sum(len(fixes) for fixes in issues_fixed.values())
         
-        report_lines.append("修复统计:")
-        report_lines.append(f"  发现问题总数: {total_issues_found}")
-        report_lines.append(f"  成功修复数量: {total_issues_fixed}")
-        report_lines.append(f"  修复成功率: {(total_issues_fixed/total_issues_found*100):.1f}%" if total_issues_found > 0 else "  修复成功率: 100.0%")
-        report_lines.append("")
+        append("修复统计:")
+        append(f"  发现问题总数: {total_issues_found}")
+        append(f"  成功修复数量: {total_issues_fixed}")
+        append(f"  修复成功率: {(total_issues_fixed/total_issues_found*100):.1f}%" if total_issues_found > 0 else "  修复成功率: 100.0%")
+        append("")
         
         # 详细问题报告
-        if issues_found["file_errors"]:
-            report_lines.append("文件错误:")
-            for error in issues_found["file_errors"]:
-                report_lines.append(f"  ❌ {error}")
-            report_lines.append("")
-        
-        if issues_found["structure_errors"]:
-            report_lines.append("结构错误:")
-            for error in issues_found["structure_errors"]:
-                report_lines.append(f"  ❌ {error}")
-            report_lines.append("")
-        
-        if issues_found["info_errors"]:
-            report_lines.append("Info字段错误:")
-            for error in issues_found["info_errors"]:
-                report_lines.append(f"  ❌ {error}")
-            report_lines.append("")
-        
-        if issues_found["record_errors"]:
-            report_lines.append("记录字段错误:")
-            for error in issues_found["record_errors"]:
-                report_lines.append(f"  ❌ {error}")
-            report_lines.append("")
-        
-        if issues_found["duplicate_ids"]:
-            report_lines.append("重复ID:")
-            for dup in issues_found["duplicate_ids"]:
-                report_lines.append(f"  ❌ ID '{dup}' 出现多次")
-            report_lines.append("")
-        
-        if issues_found["time_format_errors"]:
-            report_lines.append("时间格式错误:")
-            for error in issues_found["time_format_errors"]:
-                report_lines.append(f"  ❌ {error}")
-            report_lines.append("")
-        
-        if issues_found["data_type_errors"]:
-            report_lines.append("数据类型错误:")
-            for error in issues_found["data_type_errors"]:
-                report_lines.append(f"  ❌ {error}")
-            report_lines.append("")
+        _add_report_section(report_lines, "文件错误:", issues_found["file_errors"], "  ❌ {}")
+        _add_report_section(report_lines, "结构错误:", issues_found["structure_errors"], "  ❌ {}")
+        _add_report_section(report_lines, "Info字段错误:", issues_found["info_errors"], "  ❌ {}")
+        _add_report_section(report_lines, "记录字段错误:", issues_found["record_errors"], "  ❌ {}")
+        _add_report_section(report_lines, "重复ID:", issues_found["duplicate_ids"], "  ❌ ID '{}' 出现多次")
+        _add_report_section(report_lines, "时间格式错误:", issues_found["time_format_errors"], "  ❌ {}")
+        _add_report_section(report_lines, "数据类型错误:", issues_found["data_type_errors"], "  ❌ {}")
         
         # 修复详情
         if any(issues_fixed.values()):
-            report_lines.append("修复详情:")
-            
-            if issues_fixed["missing_fields"]:
-                report_lines.append("  缺失字段修复:")
-                for fix in issues_fixed["missing_fields"]:
-                    report_lines.append(f"    ✅ {fix}")
-                report_lines.append("")
-            
-            if issues_fixed["data_types"]:
-                report_lines.append("  数据类型修复:")
-                for fix in issues_fixed["data_types"]:
-                    report_lines.append(f"    ✅ {fix}")
-                report_lines.append("")
-            
-            if issues_fixed["time_formats"]:
-                report_lines.append("  时间格式修复:")
-                for fix in issues_fixed["time_formats"]:
-                    report_lines.append(f"    ✅ {fix}")
-                report_lines.append("")
-            
-            if issues_fixed["duplicates"]:
-                report_lines.append("  重复记录处理:")
-                for fix in issues_fixed["duplicates"]:
-                    report_lines.append(f"    ✅ {fix}")
-                report_lines.append("")
+            append("修复详情:")
+            _add_report_section(report_lines, "  缺失字段修复:", issues_fixed["missing_fields"], "    ✅ {}")
+            _add_report_section(report_lines, "  数据类型修复:", issues_fixed["data_types"], "    ✅ {}")
+            _add_report_section(report_lines, "  时间格式修复:", issues_fixed["time_formats"], "    ✅ {}")
+            _add_report_section(report_lines, "  重复记录处理:", issues_fixed["duplicates"], "    ✅ {}")
         
         # 无法修复的问题
-        unfixable_issues = []
-        if issues_found["file_errors"]:
-            unfixable_issues.extend(issues_found["file_errors"])
-        if issues_found["structure_errors"]:
-            unfixable_issues.extend(issues_found["structure_errors"])
+        unfixable_issues = issues_found["file_errors"] + issues_found["structure_errors"]
         
         if unfixable_issues:
-            report_lines.append("无法自动修复的问题:")
-            for issue in unfixable_issues:
-                report_lines.append(f"  ⚠️  {issue}")
-            report_lines.append("")
-            report_lines.append("建议:")
-            report_lines.append("  - 检查原始文件是否损坏")
-            report_lines.append("  - 确认文件格式是否正确")
-            report_lines.append("  - 联系数据提供方获取正确格式的文件")
-            report_lines.append("")
-        
-        report_lines.append("=" * 60)
+            _add_report_section(report_lines, "无法自动修复的问题:", unfixable_issues, "  ⚠️  {}")
+            append("建议:")
+            append("  - 检查原始文件是否损坏")
+            append("  - 确认文件格式是否正确")
+            append("  - 联系数据提供方获取正确格式的文件")
+            append("")
+        
+        append("=" * 60)
         
         return "\n".join(report_lines)
     
-    def repair_file(self, file_path, output_dir, progress_callback=None):
+    def repair_file(self, file_path, output_dir, progress_callback=None, output_name=None):
         """
         修复文件并生成修复报告
         
@@ -758,6 +897,7 @@ class FileRepairer:
             file_path (str): 输入文件路径
             output_dir (str): 输出目录路径
             progress_callback (callable): 进度回调函数
+            output_name (str): 输出文件名前缀，默认为输入文件名（不含扩展名）
             
         Returns:
             tuple: (success, error_message, repair_info)
@@ -840,13 +980,15 @@ class FileRepairer:
                 progress_callback(80, 100, "正在保存修复后的文件...")
             
             # 保存修复后的文件
-            original_filename = os.path.splitext(os.path.basename(file_path))[0]
+            original_filename = output_name or os.path.splitext(os.path.basename(file_path))[0]
             repaired_filename = f"{original_filename}_repaired.json"
             repaired_file_path = os.path.join(output_dir, repaired_filename)
             
             try:
-                with open(repaired_file_path, 'w', encoding='utf-8') as f:
-                    json.dump(data, f, ensure_ascii=False, indent=2, separators=(',', ': '))
+                # 修复时整个数据树已在内存中，相比之下编码结果占用的内存很小，
+                # 一次性编码整个文档（orjson可用时在C中完成）比逐条记录编码写入更快
+                with open(repaired_file_path, 'wb') as f:
+                    f.write(dump_json_bytes(data))
             except Exception as e:
                 error_msg = f"保存修复后文件时发生错误: {str(e)}"
                 return False, error_msg, {
@@ -903,6 +1045,52 @@ class FileRepairer:
         except Exception as e:
             return False, f"修复文件时发生未知错误: {str(e)}", None
     
+    def repair_files(self, file_paths, output_dir, progress_callback=None, max_workers=4):
+        """
+        使用线程池批量修复多个文件，一个文件的读取和写入与其他文件的解析和修复相互重叠
+        
+        Args:
+            file_paths (list): 输入文件路径列表
+            output_dir (str): 输出目录路径，所有修复后的文件和报告都保存到该目录，
+                              文件名重复时依次添加 _2、_3 等后缀
+            progress_callback (callable): 进度回调函数，接收(current, total, message)参数，在调用线程中执行
+            max_workers (int): 最大线程数
+            
+        Returns:
+            list: 与file_paths顺序对应的(file_path, success, error_message, repair_info)列表
+        """
+        if not file_paths:
+            return []
+        
+        # 先在调用线程中创建输出目录，各线程中的repair_file只需检查已存在的目录，不会同时进行写入测试
+        success, error_msg = create_output_directory(output_dir)
+        if not success:
+            return [(file_path, False, f"无法创建输出目录: {error_msg}", None) for file_path in file_paths]
+        
+        total = len(file_paths)
+        results = [None] * total
+        
+        # 同名文件依次加序号后缀，避免多个线程写入同一个修复文件和报告
+        output_names = unique_output_stems(file_paths)
+        
+        with ThreadPoolExecutor(max_workers=min(max_workers, total)) as executor:
+            futures = {executor.submit(self.repair_file, file_path, output_dir, output_name=output_names[index]): index
+                       for index, file_path in enumerate(file_paths)}
+            
+            for completed, future in enumerate(as_completed(futures), 1):
+                index = futures[future]
+                file_path = file_paths[index]
+                try:
+                    success, error_message, repair_info = future.result()
+                except Exception as e:
+                    success, error_message, repair_info = False, f"修复文件时发生未知错误: {str(e)}", None
+                results[index] = (file_path, success, error_message, repair_info)
+                
+                if progress_callback:
+                    progress_callback(completed, total, f"已修复 {completed}/{total} 个文件: {os.path.basename(file_path)}")
+        
+        return results
+    
     def _generate_error_report(self, issues_found, file_path):
         """
         生成错误报告（用于无法修复的情况）
@@ -915,77 +1103,46 @@ class FileRepairer:
             str: 错误报告文本
         """
         report_lines = []
-        report_lines.append("=" * 60)
-        report_lines.append("UIGF/SRGF 文件错误分析报告")
-        report_lines.append("=" * 60)
-        report_lines.append(f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-        report_lines.append(f"文件路径: {file_path}")
-        report_lines.append(f"游戏类型: {self.format_info['format_name'] if self.format_info else '未知'}")
-        report_lines.append("")
+        append = report_lines.append
+        
+        append("=" * 60)
+        append("UIGF/SRGF 文件错误分析报告")
+        append("=" * 60)
+        append(f"生成时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        append(f"文件路径: {file_path}")
+        append(f"游戏类型: {self.format_info['format_name'] if self.format_info else '未知'}")
+        append("")
         
         # 统计信息
         total_issues = sum(len(issues) for issues in issues_found.values())
-        report_lines.append(f"检测到问题总数: {total_issues}")
-        report_lines.append("")
+        append(f"检测到问题总数: {total_issues}")
+        append("")
         
         # 严重错误（无法修复）
-        if issues_found["file_errors"]:
-            report_lines.append("严重文件错误（无法自动修复）:")
-            for error in issues_found["file_errors"]:
-                report_lines.append(f"  ❌ {error}")
-            report_lines.append("")
-        
-        if issues_found["structure_errors"]:
-            report_lines.append("严重结构错误（无法自动修复）:")
-            for error in issues_found["structure_errors"]:
-                report_lines.append(f"  ❌ {error}")
-            report_lines.append("")
+        _add_report_section(report_lines, "严重文件错误（无法自动修复）:", issues_found["file_errors"], "  ❌ {}")
+        _add_report_section(report_lines, "严重结构错误（无法自动修复）:", issues_found["structure_errors"], "  ❌ {}")
         
         # 其他问题（可能可以修复）
-        if issues_found["info_errors"]:
-            report_lines.append("Info字段问题:")
-            for error in issues_found["info_errors"]:
-                report_lines.append(f"  ⚠️  {error}")
-            report_lines.append("")
-        
-        if issues_found["record_errors"]:
-            report_lines.append("记录字段问题:")
-            for error in issues_found["record_errors"]:
-                report_lines.append(f"  ⚠️  {error}")
-            report_lines.append("")
-        
-        if issues_found["duplicate_ids"]:
-            report_lines.append("重复ID问题:")
-            for dup in issues_found["duplicate_ids"]:
-                report_lines.append(f"  ⚠️  {dup}")
-            report_lines.append("")
-        
-        if issues_found["time_format_errors"]:
-            report_lines.append("时间格式问题:")
-            for error in issues_found["time_format_errors"]:
-                report_lines.append(f"  ⚠️  {error}")
-            report_lines.append("")
-        
-        if issues_found["data_type_errors"]:
-            report_lines.append("数据类型问题:")
-            for error in issues_found["data_type_errors"]:
-                report_lines.append(f"  ⚠️  {error}")
-            report_lines.append("")
+        _add_report_section(report_lines, "Info字段问题:", issues_found["info_errors"], "  ⚠️  {}")
+        _add_report_section(report_lines, "记录字段问题:", issues_found["record_errors"], "  ⚠️  {}")
+        _add_report_section(report_lines, "重复ID问题:", issues_found["duplicate_ids"], "  ⚠️  {}")
+        _add_report_section(report_lines, "时间格式问题:", issues_found["time_format_errors"], "  ⚠️  {}")
+        _add_report_section(report_lines, "数据类型问题:", issues_found["data_type_errors"], "  ⚠️  {}")
         
         # 修复建议
-        report_lines.append("修复建议:")
+        append("修复建议:")
         if issues_found["file_errors"] or issues_found["structure_errors"]:
-            report_lines.append("  由于存在严重的文件或结构错误，建议:")
-            report_lines.append("  1. 检查原始文件是否完整且未损坏")
-            report_lines.append("  2. 确认文件确实是UIGF/SRGF格式")
-            report_lines.append("  3. 检查文件编码是否为UTF-8")
-            report_lines.append("  4. 联系数据提供方获取正确格式的文件")
+            append("  由于存在严重的文件或结构错误，建议:")
+            append("  1. 检查原始文件是否完整且未损坏")
+            append("  2. 确认文件确实是UIGF/SRGF格式")
+            append("  3. 检查文件编码是否为UTF-8")
+            append("  4. 联系数据提供方获取正确格式的文件")
         else:
-            report_lines.append("  文件基本结构正常，但存在格式问题")
-            report_lines.append("  建议使用修复功能尝试自动修复")
+            append("  文件基本结构正常，但存在格式问题")
+            append("  建议使用修复功能尝试自动修复")
         
-        report_lines.append("")
-        report_lines.append("=" * 60)
+        append("")
+        append("=" * 60)
         
         return "\n".join(report_lines)
     
@@ -1015,106 +1172,6 @@ class FileRepairer:
         
         return error_msg
     
-    def _fix_info_fields(self, info, issues_fixed):
-        """
-        修复info字段中的问题
-        
-        Args:
-            info (dict): info字段数据
-            issues_fixed (dict): 修复记录字典
-            
-        Returns:
-            dict: 修复后的info字段
-        """
-        fixed_info = info.copy()
-        
-        # 修复缺失的必需字段
-        for field in self.required_info_fields:
-            if field not in fixed_info or not fixed_info[field] or str(fixed_info[field]).strip() == "":
-                default_value = self._get_info_default_value(field)
-                if default_value is not None:
-                    fixed_info[field] = default_value
-                    issues_fixed["missing_fields"].append(f"info字段添加缺失的{field}: {default_value}")
-        
-        # 修复数据类型错误
-        for field in self.required_info_fields:
-            if field in fixed_info and fixed_info[field] is not None:
-                if not isinstance(fixed_info[field], str):
-                    old_value = fixed_info[field]
-                    old_type = type(old_value).__name__
-                    try:
-                        fixed_info[field] = str(old_value)
-                        issues_fixed["data_types"].append(f"info字段{field}从{old_type}转换为str: {old_value} -> {fixed_info[field]}")
-                    except Exception:
-                        # 转换失败，使用默认值
-                        default_value = self._get_info_default_value(field)
-                        if default_value is not None:
-                            fixed_info[field] = default_value
-                            issues_fixed["data_types"].append(f"info字段{field}转换失败，使用默认值: {default_value}")
-        
-        return fixed_info
-    
-    def _fix_records(self, records, issues_fixed, progress_callback=None):
-        """
-        修复记录列表中的问题
-        
-        Args:
-            records (list): 记录列表
-            issues_fixed (dict): 修复记录字典
-            progress_callback (callable): 进度回调函数
-            
-        Returns:
-            list: 修复后的记录列表
-        """
-        if not records:
-            return records
-        
-        fixed_records = []
-        total_records = len(records)
-        
-        # 第一步：修复各种字段问题
-        for i, record in enumerate(records):
-            if progress_callback and i % 100 == 0:  # 每100条记录更新一次进度
-                progress = 50 + (i / total_records) * 20  # 50-70%的进度
-                progress_callback(int(progress), 100, f"修复记录 {i+1}/{total_records}...")
-            
-            if not isinstance(record, dict):
-                # 跳过非字典类型的记录
-                continue
-            
-            fixed_record = record.copy()
-            
-            # 修复缺失字段
-            fixed_record, missing_fixes = self.fix_missing_fields(fixed_record, {}, i)
-            issues_fixed["missing_fields"].extend(missing_fixes)
-            
-            # 修复数据类型
-            fixed_record, type_fixes = self.fix_data_types(fixed_record)
-            issues_fixed["data_types"].extend(type_fixes)
-            
-            # 修复时间格式
-            if "time" in fixed_record and fixed_record["time"]:
-                original_time = fixed_record["time"]
-                fixed_time, success = self.fix_time_format(str(original_time))
-                if not success or fixed_time != original_time:
-                    fixed_record["time"] = fixed_time
-                    if success:
-                        issues_fixed["time_formats"].append(f"第{i+1}条记录时间格式修复: {original_time} -> {fixed_time}")
-                    else:
-                        issues_fixed["time_formats"].append(f"第{i+1}条记录时间格式无法修复，使用默认值: {original_time} -> {fixed_time}")
-            
-            fixed_records.append(fixed_record)
-        
-        # 第二步：去重处理
-        if progress_callback:
-            progress_callback(70, 100, "处理重复记录...")
-        
-        unique_records, removed_count = self.remove_duplicates(fixed_records)
-        if removed_count > 0:
-            issues_fixed["duplicates"].append(f"移除重复记录: {removed_count} 条")
-        
-        return unique_records
-    
     def _get_info_default_value(self, field):
         """
         获取info字段的默认值
@@ -1123,20 +1180,11 @@ class FileRepairer:
             field (str): 字段名
             
         Returns:
-            str: 默认值
+            str: 默认值，没有默认值的字段返回None
         """
-        if field == "uid":
-            return "000000000"
-        elif field == "lang":
-            return "zh-cn"
-        elif field == "export_time":
+        if field == "export_time":
             return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        elif field == "uigf_version":
-            return "v3.0"
-        elif field == "srgf_version":
-            return "v1.0"
-        else:
-            return ""
+        return self.info_defaults.get(field)
     
     def _fix_info_fields(self, info, issues_fixed):
         """
@@ -1151,31 +1199,19 @@ class FileRepairer:
         """
         fixed_info = info.copy()
         
-        # 修复缺失字段
-        default_values = {
-            "uid": "000000000",
-            "lang": "zh-cn",
-            "export_time": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        }
-        
-        # 添加游戏特定的版本字段默认值
-        if self.format_info:
-            version_field = self.format_info["version_field"]
-            if self.game_type == "genshin":
-                default_values[version_field] = "v3.0"
-            elif self.game_type == "starrail":
-                default_values[version_field] = "v1.0"
-        
+        # 修复缺失字段，默认值来自游戏配置，导出时间只在需要补充时生成
         for field in self.required_info_fields:
-            if field not in fixed_info or not fixed_info[field] or str(fixed_info[field]).strip() == "":
-                if field in default_values:
-                    fixed_info[field] = default_values[field]
-                    issues_fixed["missing_fields"].append(f"info.{field}: 添加默认值 '{default_values[field]}'")
+            value = fixed_info.get(field)
+            if not value or not str(value).strip():
+                default_value = self._get_info_default_value(field)
+                if default_value is not None:
+                    fixed_info[field] = default_value
+                    issues_fixed["missing_fields"].append(f"info.{field}: 添加默认值 '{default_value}'")
         
         # 修复数据类型
         for field in self.required_info_fields:
-            if field in fixed_info and fixed_info[field] is not None and not isinstance(fixed_info[field], str):
-                old_value = fixed_info[field]
+            old_value = fixed_info.get(field)
+            if old_value is not None and not isinstance(old_value, str):
                 fixed_info[field] = str(old_value)
                 issues_fixed["data_types"].append(f"info.{field}: 转换为字符串 '{old_value}' -> '{fixed_info[field]}'")
         
@@ -1208,34 +1244,43 @@ class FileRepairer:
         # 从第一条有效记录中提取默认值
         default_uid = extract_uid_from_data({"list": unique_records}) or "000000000"
         
+        # 所有记录共用的默认值
+        default_values = {
+            "uid": default_uid,
+            "lang": "zh-cn",
+            "count": "1"
+        }
+        
+        # 循环中使用的方法和列表预先绑定为局部变量
+        fix_missing_fields = self._fix_missing_fields_inplace
+        fix_data_types = self._fix_data_types_inplace
+        fix_time_format = self.fix_time_format
+        is_str = str.__instancecheck__
+        extend_missing_fixes = issues_fixed["missing_fields"].extend
+        extend_type_fixes = issues_fixed["data_types"].extend
+        append_time_fix = issues_fixed["time_formats"].append
+        append_record = fixed_records.append
+        
         for i, record in enumerate(unique_records):
             if not isinstance(record, dict):
                 continue
             
-            # 准备默认值
-            default_values = {
-                "uid": default_uid,
-                "lang": "zh-cn",
-                "count": "1"
-            }
-            
-            # 修复缺失字段
-            fixed_record, field_fixes = self.fix_missing_fields(record, default_values, i)
-            issues_fixed["missing_fields"].extend(field_fixes)
+            # 修复缺失字段（记录来自刚加载的数据，直接在原对象上修复，不再逐条复制）
+            extend_missing_fixes(fix_missing_fields(record, default_values, i))
             
-            # 修复数据类型
-            fixed_record, type_fixes = self.fix_data_types(fixed_record)
-            issues_fixed["data_types"].extend(type_fixes)
+            # 修复数据类型：所有字段值都是字符串时（绝大多数记录）一次探测即可跳过逐字段修复
+            if not all(map(is_str, record.values())):
+                extend_type_fixes(fix_data_types(record))
             
             # 修复时间格式
-            if "time" in fixed_record and fixed_record["time"]:
-                original_time = fixed_record["time"]
-                fixed_time, success = self.fix_time_format(original_time)
+            original_time = record.get("time")
+            if original_time:
+                fixed_time, success = fix_time_format(original_time)
                 if not success or fixed_time != original_time:
-                    fixed_record["time"] = fixed_time
-                    issues_fixed["time_formats"].append(f"第{i+1}条记录: '{original_time}' -> '{fixed_time}'")
+                    record["time"] = fixed_time
+                    append_time_fix(f"第{i+1}条记录: '{original_time}' -> '{fixed_time}'")
             
-            fixed_records.append(fixed_record)
+            append_record(record)
             
             # 更新进度
             if progress_callback and (i + 1) % 100 == 0:
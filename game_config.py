@@ -14,13 +14,15 @@ GAME_CONFIGS = {
         "gacha_types": ["100", "200", "301", "400", "302", "500"],
         "merge_mapping": {"400": "301"},
         "format_name": "UIGF",
-        "version_field": "uigf_version"
+        "version_field": "uigf_version",
+        "info_defaults": {"uid": "000000000", "lang": "zh-cn", "uigf_version": "v3.0"}
     },
     "starrail": {
         "gacha_types": ["1", "2", "11", "12", "21"],
         "merge_mapping": {},
         "format_name": "SRGF",
-        "version_field": "srgf_version"
+        "version_field": "srgf_version",
+        "info_defaults": {"uid": "000000000", "lang": "zh-cn", "srgf_version": "v1.0"}
     }
 }
 
@@ -66,6 +68,21 @@ class GameConfig:
             }
         return None
     
+    @staticmethod
+    def get_info_defaults(game_type):
+        """
+        获取指定游戏类型info字段的默认值（不含随时间变化的export_time）
+        
+        Args:
+            game_type (str): 游戏类型 ("genshin" 或 "starrail")
+            
+        Returns:
+            dict: 字段名到默认值的字典，如果游戏类型无效则返回空字典
+        """
+        if game_type in GAME_CONFIGS:
+            return GAME_CONFIGS[game_type]["info_defaults"]
+        return {}
+    
     @staticmethod
     def should_merge_gacha_type(game_type, gacha_type):
         """
@@ -11,6 +11,7 @@ GitHub: https://github.com/maqibg/yunzai-uigf-splitter
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import threading
+import multiprocessing
 import os
 from file_processor import FileProcessor
 from game_config import GameConfig
@@ -702,5 +703,7 @@ class MainWindow:
 
 
 if __name__ == "__main__":
+    # 打包为可执行文件后，FileProcessor.process_many 的工作进程需要此调用才能正常启动
+    multiprocessing.freeze_support()
     app = MainWindow()
     app.run()
@@ -10,8 +10,138 @@ GitHub: https://github.com/maqibg/yunzai-uigf-splitte
 
 import os
 import json
+import mmap
+import stat
+from functools import lru_cache
 from game_config import GameConfig
 
+try:
+    import orjson
+except ImportError:
+    # orjson为可选依赖，未安装时使用标准库json
+    orjson = None
+
+# 读取JSON文件时使用的缓冲区大小（1MB），提升大文件顺序读取吞吐
+JSON_READ_BUFFER_SIZE = 1 << 20
+
+# 写入JSON文件时使用的缓冲区大小（1MB），逐条写入的小块数据在缓冲区中合并后再写入磁盘
+JSON_WRITE_BUFFER_SIZE = 1 << 20
+
+# 达到该大小（16MB）的文件在orjson可用时通过内存映射解析，避免整文件复制到bytes对象
+JSON_MMAP_THRESHOLD = 16 * 1024 * 1024
+
+
+def loads_json_bytes(raw):
+    """
+    解析UTF-8编码的JSON字节串，优先使用orjson
+    
+    Args:
+        raw (bytes | memoryview): JSON字节串
+        
+    Returns:
+        解析后的数据
+        
+    Raises:
+        json.JSONDecodeError: JSON格式错误（orjson.JSONDecodeError是其子类）
+        UnicodeDecodeError: 内容不是有效的UTF-8编码
+    """
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            # orjson把编码错误也报告为JSONDecodeError，重新解码以抛出UnicodeDecodeError
+            str(raw, 'utf-8')
+            raise
+    # 先按UTF-8解码，与orjson一致：不自动识别UTF-16/32，也不接受BOM
+    return json.loads(str(raw, 'utf-8'))
+
+
+def load_json_file(file_path):
+    """
+    读取并解析JSON文件
+    
+    Args:
+        file_path (str): 文件路径
+        
+    Returns:
+        解析后的数据，异常与 loads_json_bytes 相同
+    """
+    with open(file_path, 'rb', buffering=JSON_READ_BUFFER_SIZE) as f:
+        # orjson可直接解析内存映射区域；标准库json需要bytes，仍整体读取
+        if orjson is not None and os.fstat(f.fileno()).st_size >= JSON_MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                return loads_json_bytes(view)
+        raw = f.read()
+    return loads_json_bytes(raw)
+
+
+def dump_json_bytes(data):
+    """
+    将数据序列化为缩进2空格、不转义非ASCII字符的UTF-8 JSON字节串
+    
+    输出格式与 json.dump(data, f, ensure_ascii=False, indent=2, separators=(',', ': ')) 一致。
+    
+    Args:
+        data: 要序列化的数据
+        
+    Returns:
+        bytes: JSON字节串
+    """
+    if orjson is not None:
+        try:
+            return orjson.dumps(data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            # orjson不支持的数据（如超过64位的整数）回退到标准库
+            pass
+    return json.dumps(data, ensure_ascii=False, indent=2, separators=(',', ': ')).encode('utf-8')
+
+
+def write_json_document(f, info, records):
+    """
+    将 {"info": info, "list": records} 逐条写入二进制文件
+    
+    每条记录单独序列化后立即写入，不在内存中构建整个文件的字节串，
+    输出内容与 f.write(dump_json_bytes({"info": info, "list": records})) 完全一致。
+    
+    Args:
+        f: 以二进制写模式打开的文件对象
+        info (dict): info字段
+        records (iterable): 记录列表
+    """
+    # JSON字符串中不会出现原始换行符，直接替换换行即可为嵌套内容增加缩进
+    f.write(b'{\n  "info": ')
+    f.write(dump_json_bytes(info).replace(b'\n', b'\n  '))
+    
+    f.write(b',\n  "list": ')
+    write_json_array(f, records, b'  ')
+    f.write(b'\n}')
+
+
+def write_json_array(f, items, indent=b''):
+    """
+    将JSON数组逐个元素写入二进制文件
+    
+    每个元素单独序列化后立即写入，不在内存中构建整个数组的字节串，
+    顶层调用时输出内容与 f.write(dump_json_bytes(list(items))) 完全一致。
+    
+    Args:
+        f: 以二进制写模式打开的文件对象
+        items (iterable): 数组元素
+        indent (bytes): 数组本身所在层级的缩进，嵌套在其他对象中时使用
+    """
+    item_indent = indent + b'  '
+    first_separator = b'\n' + item_indent
+    separator = b',' + first_separator
+    
+    f.write(b'[')
+    is_empty = True
+    for item in items:
+        f.write(first_separator if is_empty else separator)
+        # JSON字符串中不会出现原始换行符，直接替换换行即可为嵌套内容增加缩进
+        f.write(dump_json_bytes(item).replace(b'\n', first_separator))
+        is_empty = False
+    f.write(b']' if is_empty else b'\n' + indent + b']')
+
 
 def validate_json_structure(data, game_type):
     """
@@ -27,6 +157,37 @@ def validate_json_structure(data, game_type):
                error_message (str): 错误信息，如果有效则为None
     """
     try:
+        return _compile_structure_validator(game_type)(data)
+    except Exception as e:
+        return False, f"验证过程中发生错误：{str(e)}"
+
+
+@lru_cache(maxsize=None)
+def _compile_structure_validator(game_type):
+    """
+    为指定游戏类型生成结构验证函数
+    
+    字段列表、版本字段和支持的gacha_type集合在生成时计算一次并绑定到闭包中，
+    每种游戏类型只生成一次，之后的验证不再重复查询配置。
+    
+    Args:
+        game_type (str): 游戏类型 ("genshin" 或 "starrail")
+        
+    Returns:
+        callable: 接收解析后的数据，返回 (is_valid, error_message)
+    """
+    # info中的必需字段，包括游戏特定的版本字段
+    required_info_fields = ("uid", "lang", "export_time")
+    format_info = GameConfig.get_file_format_info(game_type)
+    if format_info:
+        required_info_fields += (format_info["version_field"],)
+    
+    # 记录的核心必需字段及不能为空的关键字段
+    required_record_fields = ("gacha_type", "time", "name", "item_type", "rank_type", "id")
+    non_empty_record_fields = frozenset(("gacha_type", "time", "id"))
+    supported_types = frozenset(GameConfig.get_gacha_types(game_type))
+    
+    def validate(data):
         # 检查基本结构
         if not isinstance(data, dict):
             return False, "文件格式错误：根对象必须是JSON对象"
@@ -44,7 +205,6 @@ def validate_json_structure(data, game_type):
             return False, "文件格式错误：info字段必须是对象"
         
         # 检查info中的必需字段
-        required_info_fields = ["uid", "lang", "export_time"]
         for field in required_info_fields:
             if field not in info:
                 return False, f"文件格式错误：info中缺少{field}字段"
@@ -52,59 +212,37 @@ def validate_json_structure(data, game_type):
             if not info[field] or str(info[field]).strip() == "":
                 return False, f"文件格式错误：info中{field}字段不能为空"
         
-        # 检查游戏特定的版本字段
-        format_info = GameConfig.get_file_format_info(game_type)
-        if format_info:
-            version_field = format_info["version_field"]
-            if version_field not in info:
-                return False, f"文件格式错误：info中缺少{version_field}字段"
-            if not info[version_field] or str(info[version_field]).strip() == "":
-                return False, f"文件格式错误：info中{version_field}字段不能为空"
-        
         # 检查list字段
         record_list = data["list"]
         if not isinstance(record_list, list):
             return False, "文件格式错误：list字段必须是数组"
         
-        # 检查list中记录的结构（如果有记录的话）
-        if len(record_list) > 0:
-            # 检查前几条记录以确保数据一致性
-            sample_size = min(5, len(record_list))
+        # 检查前几条记录以确保数据一致性
+        for i, record in enumerate(record_list[:5]):
+            if not isinstance(record, dict):
+                return False, f"文件格式错误：第{i+1}条记录必须是对象"
+            
+            # 检查记录的核心必需字段
+            for field in required_record_fields:
+                if field not in record:
+                    return False, f"文件格式错误：第{i+1}条记录中缺少{field}字段"
+                # 检查关键字段不能为空
+                if field in non_empty_record_fields and (not record[field] or str(record[field]).strip() == ""):
+                    return False, f"文件格式错误：第{i+1}条记录中{field}字段不能为空"
+            
+            # 验证gacha_type是否为支持的类型
+            gacha_type = str(record["gacha_type"])
+            if supported_types and gacha_type not in supported_types:
+                return False, f"文件格式错误：第{i+1}条记录中gacha_type '{gacha_type}' 不是{game_type}游戏支持的类型"
             
-            for i in range(sample_size):
-                record = record_list[i]
-                
-                if not isinstance(record, dict):
-                    return False, f"文件格式错误：第{i+1}条记录必须是对象"
-                
-                # 检查记录的核心必需字段
-                required_record_fields = [
-                    "gacha_type", "time", "name", "item_type", 
-                    "rank_type", "id"
-                ]
-                
-                for field in required_record_fields:
-                    if field not in record:
-                        return False, f"文件格式错误：第{i+1}条记录中缺少{field}字段"
-                    # 检查关键字段不能为空
-                    if field in ["gacha_type", "time", "id"] and (not record[field] or str(record[field]).strip() == ""):
-                        return False, f"文件格式错误：第{i+1}条记录中{field}字段不能为空"
-                
-                # 验证gacha_type是否为支持的类型
-                gacha_type = str(record["gacha_type"])
-                supported_types = GameConfig.get_gacha_types(game_type)
-                if supported_types and gacha_type not in supported_types:
-                    return False, f"文件格式错误：第{i+1}条记录中gacha_type '{gacha_type}' 不是{game_type}游戏支持的类型"
-                
-                # 验证时间格式（基本检查）
-                time_str = str(record["time"])
-                if len(time_str) < 10:  # 至少应该有日期部分
-                    return False, f"文件格式错误：第{i+1}条记录中time字段格式不正确"
+            # 验证时间格式（基本检查）
+            time_str = str(record["time"])
+            if len(time_str) < 10:  # 至少应该有日期部分
+                return False, f"文件格式错误：第{i+1}条记录中time字段格式不正确"
         
         return True, None
-        
-    except Exception as e:
-        return False, f"验证过程中发生错误：{str(e)}"
+    
+    return validate
 
 
 def create_output_directory(path):
@@ -131,10 +269,15 @@ def create_output_directory(path):
         if len(path) > 260:
             return False, f"目录路径过长（超过260字符）：{path}"
         
-        # 检查路径是否已存在
-        if os.path.exists(path):
+        # 单次stat同时判断路径是否存在以及是否为目录
+        try:
+            path_stat = os.stat(path)
+        except FileNotFoundError:
+            path_stat = None
+        
+        if path_stat is not None:
             # 检查是否为目录
-            if not os.path.isdir(path):
+            if not stat.S_ISDIR(path_stat.st_mode):
                 return False, f"路径已存在但不是目录：{path}"
             
             # 检查是否可写
@@ -153,35 +296,10 @@ def create_output_directory(path):
             
             return True, None
         
-        # 检查父目录是否存在且可写
-        parent_dir = os.path.dirname(path)
-        if parent_dir and not os.path.exists(parent_dir):
-            # 尝试创建父目录
-            try:
-                os.makedirs(parent_dir, exist_ok=True)
-            except PermissionError:
-                return False, f"权限不足，无法创建父目录：{parent_dir}"
-            except OSError as e:
-                if e.errno == 28:  # No space left on device
-                    return False, f"磁盘空间不足，无法创建目录：{parent_dir}"
-                elif e.errno == 13:  # Permission denied
-                    return False, f"权限不足，无法创建目录：{parent_dir}"
-                else:
-                    return False, f"创建父目录时发生系统错误：{str(e)}"
-        
-        if parent_dir and not os.access(parent_dir, os.W_OK):
-            return False, f"父目录不可写，请检查权限：{parent_dir}"
-        
-        # 创建目录（包括父目录）
+        # 创建目录（包括父目录），exist_ok避免与并发创建发生竞争；
+        # 权限不足、磁盘空间不足等错误由下方的异常处理给出对应提示
         os.makedirs(path, exist_ok=True)
         
-        # 验证创建成功并可写
-        if not os.path.exists(path):
-            return False, f"创建目录失败：{path}"
-        
-        if not os.access(path, os.W_OK):
-            return False, f"创建的目录不可写，请检查权限：{path}"
-        
         # 测试写入权限
         test_file = os.path.join(path, ".write_test")
         try:
@@ -474,4 +592,30 @@ def sanitize_filename(filename):
         return sanitized
         
     except Exception:
-        return "untitled"
\ No newline at end of file
+        return "untitled"
+
+def unique_output_stems(file_paths):
+    """
+    为一批输入文件生成互不相同的输出名称（不含扩展名）
+    
+    不同目录下的同名文件（如多个账号的导出文件）按输入顺序依次添加 _2、_3 等后缀，
+    忽略大小写比较，兼容不区分大小写的文件系统。
+    
+    Args:
+        file_paths (list): 输入文件路径列表
+        
+    Returns:
+        list: 与file_paths顺序对应的输出名称列表
+    """
+    stems = []
+    used_names = set()
+    for file_path in file_paths:
+        stem = os.path.splitext(os.path.basename(file_path))[0]
+        name = stem
+        suffix = 1
+        while name.lower() in used_names:
+            suffix += 1
+            name = f"{stem}_{suffix}"
+        used_names.add(name.lower())
+        stems.append(name)
+    return stems